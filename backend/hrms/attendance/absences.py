@@ -0,0 +1,134 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q
+
+from employees.models import Employee
+from .archive import archived_until
+from .models import Absence, Attendance, ArchivedAttendance
+from .schedules import get_schedule_resolver
+
+
+def absent_employee_ids(date, resolver, employee_ids=None):
+    """
+    Active employees (of `employee_ids` when given), hired by `date` and working on it by their schedule,
+    without an attendance record
+    """
+    if not resolver.any_workday(date):
+        return set()
+    employees = Employee.objects.filter(is_active=True)
+    if employee_ids is not None:
+        employees = employees.filter(id__in=employee_ids)
+    employees = (
+        employees
+        .filter(Q(hire_date__isnull=True) | Q(hire_date__lte=date))
+        .exclude(Exists(Attendance.objects.filter(employee=OuterRef('pk'), date=date)))
+        .exclude(Exists(ArchivedAttendance.objects.filter(employee=OuterRef('pk'), date=date)))
+        .values_list('id', 'department_id')
+    )
+    return {
+        employee_id for employee_id, department_id in employees
+        if resolver.is_workday(employee_id, department_id, date)
+    }
+
+
+def materialize_day(date, resolver):
+    """Makes the absences of `date` match the attendance records, returns (created, removed)"""
+    absent = absent_employee_ids(date, resolver)
+    with transaction.atomic():
+        stored = set(Absence.objects.filter(date=date).values_list('employee_id', flat=True))
+        removed = stored - absent
+        if removed:
+            Absence.objects.filter(date=date, employee_id__in=removed).delete()
+        created = absent - stored
+        Absence.objects.bulk_create(
+            [Absence(employee_id=employee_id, date=date) for employee_id in created],
+            ignore_conflicts=True,
+        )
+    return len(created), len(removed)
+
+
+def materialize_absences(start, end=None):
+    """
+    Writes the absences of every day in [start, end], running it again only applies what changed.
+    Days off of the employee's schedule, holidays and emergency days never have absences.
+    """
+    end = end or start
+    resolver = get_schedule_resolver()
+    report = {'days': 0, 'created': 0, 'removed': 0}
+
+    date = start
+    while date <= end:
+        created, removed = materialize_day(date, resolver)
+        report['days'] += 1
+        report['created'] += created
+        report['removed'] += removed
+        date += timedelta(days=1)
+    return report
+
+
+def refresh_absences(date, employee_ids):
+    """Re-applies the absences of some employees on one day, future days are left to the job"""
+    if date > datetime.now(settings.CAIRO_TZ).date():
+        return
+    employee_ids = set(employee_ids)
+    absent = absent_employee_ids(date, get_schedule_resolver(), employee_ids)
+    Absence.objects.filter(date=date, employee_id__in=employee_ids - absent).delete()
+    Absence.objects.bulk_create(
+        [Absence(employee_id=employee_id, date=date) for employee_id in absent],
+        ignore_conflicts=True,
+    )
+
+
+def clear_absences(attendances):
+    """Removes the absences replaced by new attendance records, one query per date"""
+    employees_by_date = defaultdict(set)
+    for attendance in attendances:
+        employees_by_date[attendance.date].add(attendance.employee_id)
+    for date, employee_ids in employees_by_date.items():
+        Absence.objects.filter(date=date, employee_id__in=employee_ids).delete()
+
+
+def absence_stats(start, end, department=None):
+    absences = Absence.objects.filter(date__range=(start, end))
+    attendances = Attendance.objects.filter(date__range=(start, end))
+    if department is not None:
+        absences = absences.filter(employee__department_id=department)
+        attendances = attendances.filter(employee__department_id=department)
+
+    absent = dict(absences.values_list('date').annotate(count=Count('id')).order_by())
+    present = dict(attendances.values_list('date').annotate(count=Count('id')).order_by())
+
+    last_archived = archived_until()
+    if last_archived is not None and start <= last_archived:
+        archived = ArchivedAttendance.objects.filter(date__range=(start, end))
+        if department is not None:
+            archived = archived.filter(employee__department_id=department)
+        for date, count in archived.values_list('date').annotate(count=Count('id')).order_by():
+            present[date] = present.get(date, 0) + count
+
+    days = []
+    for date in sorted(absent.keys() | present.keys()):
+        day_absent, day_present = absent.get(date, 0), present.get(date, 0)
+        days.append({
+            'date': date,
+            'absent': day_absent,
+            'present': day_present,
+            'absence_rate': absence_rate(day_absent, day_present),
+        })
+
+    total_absent, total_present = sum(absent.values()), sum(present.values())
+    return {
+        'absent': total_absent,
+        'present': total_present,
+        'absence_rate': absence_rate(total_absent, total_present),
+        'days': days,
+    }
+
+
+def absence_rate(absent, present):
+    if not absent + present:
+        return 0
+    return round(absent / (absent + present) * 100, 2)
@@ -1,6 +1,13 @@
 from django.contrib import admin
-from .models import Attendance, Day, AttendanceSettings
+from .models import Attendance, Absence, Day, AttendanceSettings, Holiday, EmergencyDay, \
+    ScheduleAssignment, ArchivedAttendance, AttendanceMonthlyRollup
 
 admin.site.register(Attendance)
+admin.site.register(Absence)
 admin.site.register(Day)
 admin.site.register(AttendanceSettings)
+admin.site.register(Holiday)
+admin.site.register(EmergencyDay)
+admin.site.register(ScheduleAssignment)
+admin.site.register(ArchivedAttendance)
+admin.site.register(AttendanceMonthlyRollup)
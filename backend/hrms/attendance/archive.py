@@ -0,0 +1,188 @@
+from collections import defaultdict
+from contextvars import ContextVar
+from datetime import date
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+
+from employees.models import Employee
+from hrms.rest_framework_utils.merged_queryset import MergedQuerySet
+from .models import Attendance, ArchivedAttendance, AttendanceMonthlyRollup
+from .schedules import get_schedule_resolver
+from .summary import AttendanceSummary, group_by_schedule
+
+ARCHIVE_BATCH_SIZE = 1000
+MAX_REPORT_MONTHS = 24
+ROLLUP_FIELDS = ['days_present', 'late_minutes', 'early_leave_minutes', 'overtime_minutes']
+
+# set while archive_month deletes the records it copied, their days keep their attendance in the archive
+archiving = ContextVar('archiving', default=False)
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def archive_horizon(today, months=None):
+    """First day of the oldest month kept in the attendance table"""
+    if months is None:
+        months = getattr(settings, 'ATTENDANCE_ARCHIVE_AFTER_MONTHS', 12)
+    return add_months(month_start(today), -months)
+
+
+def archived_until():
+    """Last archived date, reports read older ranges from the archive and the rollups"""
+    return ArchivedAttendance.objects.aggregate(last=Max('date'))['last']
+
+
+def attendance_queryset(start=None):
+    """
+    Attendance records to read from `start` on (None for the whole history): the attendance table, merged with
+    the archive when the range reaches archived dates. Only the attendance table is editable.
+    """
+    queryset = Attendance.objects.all()
+    last_archived = archived_until()
+    if last_archived is None or (start is not None and start > last_archived):
+        return queryset
+    return MergedQuerySet([queryset, ArchivedAttendance.objects.all()], Attendance._meta.ordering)
+
+
+def rollup_records(records, resolver):
+    """{(employee id, month): [days present, late, early leave, overtime minutes]} of attendance records"""
+    totals = defaultdict(lambda: [0, 0, 0, 0])
+    for schedule, indexes in group_by_schedule(records, resolver).items():
+        group = [records[index] for index in indexes]
+        late, early, extra = AttendanceSummary(schedule).measure(group)
+        for i, record in enumerate(group):
+            row = totals[(record.employee_id, month_start(record.date))]
+            row[0] += 1
+            row[1] += late[i]
+            row[2] += early[i]
+            row[3] += extra[i] or 0
+    return totals
+
+
+def build_rollups(totals):
+    return [
+        AttendanceMonthlyRollup(
+            employee_id=employee_id,
+            month=month,
+            **{field: round(value) for field, value in zip(ROLLUP_FIELDS, row)},
+        )
+        for (employee_id, month), row in totals.items()
+    ]
+
+
+def archive_month(month, resolver):
+    """
+    Moves the attendance records of `month` to the archive and rebuilds its rollups from the whole archived month,
+    so records added to an already archived month are folded in on the next run. Returns the moved count.
+    """
+    next_month = add_months(month, 1)
+    with transaction.atomic():
+        records = list(
+            Attendance.objects.filter(date__gte=month, date__lt=next_month)
+            .select_related('employee')
+            .only('date', 'check_in', 'check_out', 'employee__department_id')
+        )
+        if not records:
+            return 0
+
+        # archived rows keep their id, the history lists both tables as one sequence
+        ArchivedAttendance.objects.bulk_create(
+            [
+                ArchivedAttendance(
+                    id=record.pk,
+                    employee_id=record.employee_id,
+                    date=record.date,
+                    check_in=record.check_in,
+                    check_out=record.check_out,
+                )
+                for record in records
+            ],
+            batch_size=ARCHIVE_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['date', 'employee'],
+            update_fields=['check_in', 'check_out'],
+        )
+        # only what was archived, records added to the month meanwhile wait for the next run
+        pks = [record.pk for record in records]
+        token = archiving.set(True)
+        try:
+            for start in range(0, len(pks), ARCHIVE_BATCH_SIZE):
+                Attendance.objects.filter(pk__in=pks[start:start + ARCHIVE_BATCH_SIZE]).delete()
+        finally:
+            archiving.reset(token)
+
+        archived = list(
+            ArchivedAttendance.objects.filter(date__gte=month, date__lt=next_month)
+            .select_related('employee')
+            .only('date', 'check_in', 'check_out', 'employee__department_id')
+        )
+        AttendanceMonthlyRollup.objects.bulk_create(
+            build_rollups(rollup_records(archived, resolver)),
+            batch_size=ARCHIVE_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['employee', 'month'],
+            update_fields=ROLLUP_FIELDS,
+        )
+    return len(records)
+
+
+def archive_attendance(before):
+    """Archives every month that ends before `before` (the first day of a month), one transaction per month"""
+    oldest = Attendance.objects.filter(date__lt=before).order_by('date').values_list('date', flat=True).first()
+    report = {'months': 0, 'archived': 0}
+    if oldest is None:
+        return report
+
+    resolver = get_schedule_resolver()
+    month = month_start(oldest)
+    while month < before:
+        moved = archive_month(month, resolver)
+        if moved:
+            report['months'] += 1
+            report['archived'] += moved
+        month = add_months(month, 1)
+    return report
+
+
+def monthly_report(start, end, department=None):
+    """
+    Per employee and month totals of [start month, end month].
+
+    Archived months are read from the rollups, the others are computed from the attendance table.
+    """
+    last_archived = archived_until()
+    split = add_months(month_start(last_archived), 1) if last_archived else start
+    split = min(max(split, start), add_months(end, 1))
+
+    rows = {}
+    if start < split:
+        rollups = AttendanceMonthlyRollup.objects.filter(month__gte=start, month__lt=split)
+        if department is not None:
+            rollups = rollups.filter(employee__department_id=department)
+        for rollup in rollups.values('employee_id', 'month', *ROLLUP_FIELDS):
+            rows[(rollup.pop('employee_id'), rollup.pop('month'))] = [rollup[field] for field in ROLLUP_FIELDS]
+
+    if split <= end:
+        records = Attendance.objects.filter(date__gte=split, date__lt=add_months(end, 1))
+        if department is not None:
+            records = records.filter(employee__department_id=department)
+        records = list(
+            records.select_related('employee').only('date', 'check_in', 'check_out', 'employee__department_id')
+        )
+        for key, row in rollup_records(records, get_schedule_resolver()).items():
+            rows[key] = [round(value) for value in row]
+
+    names = dict(Employee.objects.filter(id__in={key[0] for key in rows}).values_list('id', 'name'))
+    return [
+        {'employee': employee_id, 'name': names.get(employee_id), 'month': month, **dict(zip(ROLLUP_FIELDS, row))}
+        for (employee_id, month), row in sorted(rows.items())
+    ]
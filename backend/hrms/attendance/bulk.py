@@ -0,0 +1,133 @@
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+from employees.models import Employee
+from .absences import clear_absences
+from .occupancy import record_attendances
+from .models import Attendance
+
+UPSERT_BATCH_SIZE = 500
+
+
+class DayAttendanceRecordSerializer(serializers.ModelSerializer):
+    """One record of a day, validated without database access; rows and employees are resolved per day"""
+    id = serializers.IntegerField(required=False)
+    saved = serializers.BooleanField(default=False)
+    employee = serializers.IntegerField(required=False)
+
+    class Meta:
+        model = Attendance
+        fields = ['id', 'saved', 'employee', 'check_in', 'check_out']
+        extra_kwargs = {'check_in': {'required': False}}
+
+    def validate(self, attrs):
+        required = ['id'] if attrs['saved'] else ['employee', 'check_in']
+        missing = {field: [self.fields[field].error_messages['required']] for field in required if field not in attrs}
+        if missing:
+            raise serializers.ValidationError(missing)
+        return attrs
+
+
+def upsert_attendances(attendances, batch_size=UPSERT_BATCH_SIZE):
+    """Inserts the records, or replaces the times of the existing record of the same employee and date"""
+    attendances = Attendance.objects.bulk_create(
+        attendances,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['date', 'employee'],
+        update_fields=['check_in', 'check_out'],
+    )
+    # bulk_create skips the post_save signals
+    clear_absences(attendances)
+    record_attendances(attendances)
+    return attendances
+
+
+class DayAttendanceWriter:
+    """
+    Validates the records of a day, then reads the saved records and employees and upserts the valid records
+    in one transaction.
+
+    Saved records are looked up with one query and merged with the submitted fields, employees are checked
+    with one more, so a whole department costs a constant number of queries.
+    """
+
+    def __init__(self, date):
+        self.date = date
+        self.validator = DayAttendanceRecordSerializer()
+        self.results = []
+
+    def save(self, records):
+        self.results = [None] * len(records)
+        valid = []
+        for index, record in enumerate(records):
+            try:
+                valid.append((index, self.validator.run_validation(record)))
+            except serializers.ValidationError as e:
+                self.fail(index, record.get('employee') if isinstance(record, dict) else None, e.detail)
+
+        # the rows merged with the submitted fields are the ones written, nothing changes them in between
+        with transaction.atomic():
+            saved = Attendance.objects.select_for_update().in_bulk(
+                [data['id'] for index, data in valid if data['saved']]
+            )
+            employee_ids = {data['employee'] for index, data in valid if 'employee' in data}
+            employees = set(Employee.objects.filter(id__in=employee_ids).values_list('id', flat=True))
+
+            attendances = {}
+            for index, data in valid:
+                attendance = self.build(index, data, saved, employees)
+                if attendance is None:
+                    continue
+                key = (attendance.date, attendance.employee_id)
+                if key in attendances:
+                    self.fail(index, attendance.employee_id, {
+                        'employee': [_("تم إرسال أكثر من سجل لنفس الموظف في هذا اليوم.")]
+                    })
+                    continue
+                attendances[key] = attendance
+                self.results[index] = {'index': index, 'employee': attendance.employee_id, 'status': 'saved'}
+
+            upsert_attendances(list(attendances.values()))
+
+        return self.results
+
+    def fail(self, index, employee, errors):
+        self.results[index] = {'index': index, 'employee': employee, 'status': 'invalid', 'errors': errors}
+
+    def build(self, index, data, saved, employees):
+        if data['saved']:
+            existing = saved.get(data['id'])
+            if existing is None:
+                self.fail(index, data.get('employee'), {'id': [_("سجل الحضور غير موجود.")]})
+                return None
+            if data.get('employee', existing.employee_id) != existing.employee_id:
+                self.fail(index, data['employee'], {'employee': [_("لا يمكن تغيير موظف سجل محفوظ.")]})
+                return None
+            attendance = Attendance(
+                employee_id=existing.employee_id,
+                date=existing.date,
+                check_in=data.get('check_in', existing.check_in),
+                check_out=data['check_out'] if 'check_out' in data else existing.check_out,
+            )
+        else:
+            attendance = Attendance(
+                employee_id=data['employee'],
+                date=self.date,
+                check_in=data['check_in'],
+                check_out=data.get('check_out'),
+            )
+
+        if attendance.employee_id not in employees and not data['saved']:
+            message = serializers.PrimaryKeyRelatedField.default_error_messages['does_not_exist']
+            self.fail(index, attendance.employee_id, {'employee': [message.format(pk_value=attendance.employee_id)]})
+            return None
+
+        if attendance.check_out and attendance.check_out < attendance.check_in:
+            self.fail(index, attendance.employee_id, {
+                'check_out': [_("وقت الانصراف لا يمكن أن يكون قبل وقت الحضور.")]
+            })
+            return None
+
+        return attendance
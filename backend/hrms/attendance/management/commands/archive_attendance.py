@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from attendance.archive import archive_attendance, archive_horizon
+
+
+class Command(BaseCommand):
+    help = "Move attendance records older than the archive horizon to the archive and update the monthly rollups"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months', type=int, default=None,
+            help="whole months to keep, defaults to the ATTENDANCE_ARCHIVE_AFTER_MONTHS setting",
+        )
+
+    def handle(self, *args, **options):
+        today = datetime.now(settings.CAIRO_TZ).date()
+        before = archive_horizon(today, options['months'])
+
+        report = archive_attendance(before)
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {report['archived']} records of {report['months']} months before {before.isoformat()}"
+        ))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance.punches import PunchIngester, PunchFileError, read_punches
+
+
+class Command(BaseCommand):
+    help = "Create or update attendance records from a CSV or NDJSON file of badge punches (employee_id, timestamp)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        ingester = PunchIngester(batch_size=options['batch_size'])
+        try:
+            with open(options['path'], 'rb') as file:
+                report = ingester.run(read_punches(file, options['path']))
+        except (OSError, PunchFileError) as e:
+            raise CommandError(str(e))
+
+        for error in report['errors']:
+            messages = "; ".join(f"{field}: {' '.join(map(str, errors))}" for field, errors in error['errors'].items())
+            self.stderr.write(f"row {error['row']}: {messages}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['total']} punches, {report['records']} attendance records, {len(report['errors'])} errors"
+        ))
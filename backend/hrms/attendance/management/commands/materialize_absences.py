@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from attendance.absences import materialize_absences
+
+
+class Command(BaseCommand):
+    help = "Record the absences of a day (today by default) or, with --start/--end, of a historical range"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help="YYYY-MM-DD, defaults to today")
+        parser.add_argument('--start', help="first day of a backfill, YYYY-MM-DD")
+        parser.add_argument('--end', help="last day of a backfill, YYYY-MM-DD, defaults to today")
+
+    def parse(self, value):
+        try:
+            date = parse_date(value)
+        except ValueError:
+            date = None
+        if date is None:
+            raise CommandError(f"Invalid date {value}")
+        return date
+
+    def handle(self, *args, **options):
+        today = datetime.now(settings.CAIRO_TZ).date()
+        if options['start']:
+            start = self.parse(options['start'])
+            end = self.parse(options['end']) if options['end'] else today
+        else:
+            start = end = self.parse(options['date']) if options['date'] else today
+
+        if end < start:
+            raise CommandError("--end is before --start")
+
+        report = materialize_absences(start, end)
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['days']} days, {report['created']} absences recorded, {report['removed']} removed"
+        ))
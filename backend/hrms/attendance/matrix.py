@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+from employees.models import Employee
+from .archive import archived_until
+from .models import Attendance, ArchivedAttendance
+
+# packed value of a missing record or check-out
+MISSING = -1
+MAX_MATRIX_DAYS = 62
+
+
+def to_minutes(value):
+    return value.hour * 60 + value.minute if value is not None else MISSING
+
+
+def build_attendance_matrix(start, end, department=None):
+    """
+    Attendance of [start, end] as an employee x day grid.
+
+    `check_in` and `check_out` are flat row-major lists of minutes since midnight, the cell of employee `i`
+    on day `j` is at `i * len(dates) + j`, and MISSING marks days without a record (or without a check-out).
+    Every active employee gets a row, an employee absent the whole range is all MISSING.
+    """
+    dates = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    day_index = {date: index for index, date in enumerate(dates)}
+
+    # archived months are read from the archive table as well
+    models = [Attendance]
+    last_archived = archived_until()
+    if last_archived is not None and start <= last_archived:
+        models.append(ArchivedAttendance)
+
+    rows = []
+    for model in models:
+        attendances = model.objects.filter(date__range=(start, end))
+        if department is not None:
+            attendances = attendances.filter(employee__department_id=department)
+        rows.extend(attendances.values_list('employee_id', 'employee__name', 'date', 'check_in', 'check_out'))
+
+    # active employees are listed even without any record in the range, others only when they have one
+    active = Employee.objects.filter(is_active=True)
+    if department is not None:
+        active = active.filter(department_id=department)
+    names = dict(active.values_list('id', 'name'))
+    for employee_id, name, *_ in rows:
+        names.setdefault(employee_id, name)
+
+    employees = sorted(names)
+    employee_index = {employee_id: index for index, employee_id in enumerate(employees)}
+    check_in = [MISSING] * (len(employees) * len(dates))
+    check_out = list(check_in)
+    for employee_id, name, date, row_check_in, row_check_out in rows:
+        cell = employee_index[employee_id] * len(dates) + day_index[date]
+        check_in[cell] = to_minutes(row_check_in)
+        check_out[cell] = to_minutes(row_check_out)
+
+    return {
+        'dates': [date.isoformat() for date in dates],
+        'employees': employees,
+        'names': [names[employee_id] for employee_id in employees],
+        'missing': MISSING,
+        'check_in': check_in,
+        'check_out': check_out,
+    }
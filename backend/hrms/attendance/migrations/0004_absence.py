@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 19:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0003_attendance_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Absence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='تاريخ الغياب')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='employees.employee', verbose_name='الموظف')),
+            ],
+            options={
+                'verbose_name': 'غياب',
+                'verbose_name_plural': 'الغياب',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['employee', 'date'], name='attendance__employe_b18315_idx')],
+                'unique_together': {('date', 'employee')},
+            },
+        ),
+    ]
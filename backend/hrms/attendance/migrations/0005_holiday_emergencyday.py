@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-18 19:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0004_absence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmergencyDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(error_messages={'invalid': 'يرجى إدخال تاريخ صحيح.', 'unique': 'يوجد يوم مسجل بهذا التاريخ.'}, unique=True, verbose_name='التاريخ')),
+                ('name', models.CharField(max_length=100, verbose_name='الاسم')),
+            ],
+            options={
+                'verbose_name': 'يوم طوارئ',
+                'verbose_name_plural': 'أيام الطوارئ',
+                'ordering': ['date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Holiday',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(error_messages={'invalid': 'يرجى إدخال تاريخ صحيح.', 'unique': 'يوجد يوم مسجل بهذا التاريخ.'}, unique=True, verbose_name='التاريخ')),
+                ('name', models.CharField(max_length=100, verbose_name='الاسم')),
+            ],
+            options={
+                'verbose_name': 'إجازة',
+                'verbose_name_plural': 'الإجازات',
+                'ordering': ['date'],
+            },
+        ),
+    ]
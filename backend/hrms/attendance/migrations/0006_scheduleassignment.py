@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-18 19:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0005_holiday_emergencyday'),
+        ('employees', '0013_employee_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField(verbose_name='تاريخ البداية')),
+                ('end_date', models.DateField(blank=True, null=True, verbose_name='تاريخ النهاية')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='schedule_assignments', to='employees.department', verbose_name='القسم')),
+                ('employee', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='schedule_assignments', to='employees.employee', verbose_name='الموظف')),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='attendance.attendancesettings', verbose_name='جدول العمل')),
+            ],
+            options={
+                'verbose_name': 'تعيين جدول عمل',
+                'verbose_name_plural': 'تعيينات جداول العمل',
+                'ordering': ['start_date', 'id'],
+                'constraints': [models.CheckConstraint(condition=models.Q(models.Q(('department__isnull', True), ('employee__isnull', False)), models.Q(('department__isnull', False), ('employee__isnull', True)), _connector='OR'), name='schedule_assignment_single_target')],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2 on 2026-10-18 19:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0006_scheduleassignment'),
+        ('employees', '0013_employee_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='تاريخ الحضور')),
+                ('check_in', models.TimeField(verbose_name='وقت الحضور')),
+                ('check_out', models.TimeField(blank=True, null=True, verbose_name='وقت الانصراف')),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='employees.employee', verbose_name='الموظف')),
+            ],
+            options={
+                'verbose_name': 'تسجيل حضور مؤرشف',
+                'verbose_name_plural': 'تسجيلات الحضور المؤرشفة',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['employee', 'date'], name='attendance__employe_092e0b_idx')],
+                'unique_together': {('date', 'employee')},
+            },
+        ),
+        migrations.CreateModel(
+            name='AttendanceMonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='أول يوم في الشهر', verbose_name='الشهر')),
+                ('days_present', models.PositiveIntegerField(default=0, verbose_name='أيام الحضور')),
+                ('late_minutes', models.PositiveIntegerField(default=0, verbose_name='دقائق التأخير')),
+                ('early_leave_minutes', models.PositiveIntegerField(default=0, verbose_name='دقائق الانصراف المبكر')),
+                ('overtime_minutes', models.PositiveIntegerField(default=0, verbose_name='دقائق العمل الإضافي')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='employees.employee', verbose_name='الموظف')),
+            ],
+            options={
+                'verbose_name': 'ملخص حضور شهري',
+                'verbose_name_plural': 'ملخصات الحضور الشهرية',
+                'ordering': ['month', 'employee'],
+                'indexes': [models.Index(fields=['month', 'employee'], name='attendance__month_8b22a8_idx')],
+                'unique_together': {('employee', 'month')},
+            },
+        ),
+    ]
@@ -1,3 +1,5 @@
+from datetime import date
+
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.translation import gettext_lazy as _
@@ -40,6 +42,11 @@ class Attendance(models.Model):
         verbose_name_plural = _("تسجيلات الحضور")
         ordering = ['id']
         unique_together = ["date", "employee"]
+        indexes = [
+            # keyset pagination of the attendance history
+            models.Index(fields=["employee", "date", "id"]),
+            models.Index(fields=["date", "id"]),
+        ]
 
     def __str__(self):
         return f"{self.employee} - {self.date.strftime('%Y-%m-%d')} {self.check_in.strftime('%H:%M')}"
@@ -52,6 +59,82 @@ class Attendance(models.Model):
             })
 
 
+class Absence(models.Model):
+    """Working day without an attendance record, written by the materialize_absences job"""
+    employee = models.ForeignKey(
+        'employees.Employee',
+        on_delete=models.CASCADE,
+        verbose_name=_("الموظف")
+    )
+    date = models.DateField(verbose_name=_("تاريخ الغياب"))
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("غياب")
+        verbose_name_plural = _("الغياب")
+        ordering = ['id']
+        unique_together = ["date", "employee"]
+        indexes = [
+            models.Index(fields=["employee", "date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.employee} - {self.date.strftime('%Y-%m-%d')}"
+
+
+class ArchivedAttendance(models.Model):
+    """Attendance record moved out of the attendance table by the archive_attendance command"""
+    employee = models.ForeignKey(
+        'employees.Employee',
+        on_delete=models.CASCADE,
+        verbose_name=_("الموظف")
+    )
+    date = models.DateField(verbose_name=_("تاريخ الحضور"))
+    check_in = models.TimeField(verbose_name=_("وقت الحضور"))
+    check_out = models.TimeField(null=True, blank=True, verbose_name=_("وقت الانصراف"))
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("تسجيل حضور مؤرشف")
+        verbose_name_plural = _("تسجيلات الحضور المؤرشفة")
+        ordering = ['id']
+        unique_together = ["date", "employee"]
+        indexes = [
+            models.Index(fields=["employee", "date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.employee} - {self.date.strftime('%Y-%m-%d')} {self.check_in.strftime('%H:%M')}"
+
+
+class AttendanceMonthlyRollup(models.Model):
+    """Monthly totals of an employee's archived attendance"""
+    employee = models.ForeignKey(
+        'employees.Employee',
+        on_delete=models.CASCADE,
+        related_name="attendance_rollups",
+        verbose_name=_("الموظف")
+    )
+    month = models.DateField(_("الشهر"), help_text=_("أول يوم في الشهر"))
+    days_present = models.PositiveIntegerField(_("أيام الحضور"), default=0)
+    late_minutes = models.PositiveIntegerField(_("دقائق التأخير"), default=0)
+    early_leave_minutes = models.PositiveIntegerField(_("دقائق الانصراف المبكر"), default=0)
+    overtime_minutes = models.PositiveIntegerField(_("دقائق العمل الإضافي"), default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("ملخص حضور شهري")
+        verbose_name_plural = _("ملخصات الحضور الشهرية")
+        ordering = ['month', 'employee']
+        unique_together = ["employee", "month"]
+        indexes = [
+            models.Index(fields=["month", "employee"]),
+        ]
+
+    def __str__(self):
+        return f"{self.employee} - {self.month.strftime('%Y-%m')}"
+
+
 class Day(models.Model):
     class DayEnum(models.TextChoices):
         SATURDAY = "saturday", _("السبت")
@@ -88,3 +171,104 @@ class AttendanceSettings(models.Model):
     class Meta:
         verbose_name = _("إعدادات الحضور")
         verbose_name_plural = _("إعدادات الحضور")
+
+
+class Holiday(models.Model):
+    date = models.DateField(
+        unique=True,
+        verbose_name=_("التاريخ"),
+        error_messages={
+            'invalid': _("يرجى إدخال تاريخ صحيح."),
+            'unique': _("يوجد يوم مسجل بهذا التاريخ."),
+        }
+    )
+    name = models.CharField(_("الاسم"), max_length=100)
+
+    def __str__(self):
+        return f"{self.name} - {self.date.strftime('%Y-%m-%d')}"
+
+    class Meta:
+        verbose_name = _("إجازة")
+        verbose_name_plural = _("الإجازات")
+        ordering = ['date']
+
+
+class EmergencyDay(models.Model):
+    date = models.DateField(
+        unique=True,
+        verbose_name=_("التاريخ"),
+        error_messages={
+            'invalid': _("يرجى إدخال تاريخ صحيح."),
+            'unique': _("يوجد يوم مسجل بهذا التاريخ."),
+        }
+    )
+    name = models.CharField(_("الاسم"), max_length=100)
+
+    def __str__(self):
+        return f"{self.name} - {self.date.strftime('%Y-%m-%d')}"
+
+    class Meta:
+        verbose_name = _("يوم طوارئ")
+        verbose_name_plural = _("أيام الطوارئ")
+        ordering = ['date']
+
+
+class ScheduleAssignment(models.Model):
+    """Applies a schedule to an employee, or to a whole department, from start_date until end_date"""
+    schedule = models.ForeignKey(
+        AttendanceSettings,
+        on_delete=models.CASCADE,
+        related_name="assignments",
+        verbose_name=_("جدول العمل")
+    )
+    employee = models.ForeignKey(
+        'employees.Employee',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="schedule_assignments",
+        verbose_name=_("الموظف")
+    )
+    department = models.ForeignKey(
+        'employees.Department',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="schedule_assignments",
+        verbose_name=_("القسم")
+    )
+    start_date = models.DateField(_("تاريخ البداية"))
+    end_date = models.DateField(_("تاريخ النهاية"), null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.employee or self.department} - {self.schedule}"
+
+    class Meta:
+        verbose_name = _("تعيين جدول عمل")
+        verbose_name_plural = _("تعيينات جداول العمل")
+        ordering = ['start_date', 'id']
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(employee__isnull=False, department__isnull=True) |
+                          models.Q(employee__isnull=True, department__isnull=False),
+                name="schedule_assignment_single_target",
+            ),
+        ]
+
+    def clean(self):
+        if (self.employee_id is None) == (self.department_id is None):
+            raise ValidationError(_("يجب تحديد موظف أو قسم."))
+
+        if self.end_date and self.end_date < self.start_date:
+            raise ValidationError({
+                'end_date': _("تاريخ النهاية لا يمكن أن يكون قبل تاريخ البداية.")
+            })
+
+        # the resolver expects the periods of one employee (or department) not to overlap
+        overlapping = ScheduleAssignment.objects.filter(
+            employee_id=self.employee_id,
+            department_id=self.department_id,
+            start_date__lte=self.end_date or date.max,
+        ).filter(models.Q(end_date__isnull=True) | models.Q(end_date__gte=self.start_date)).exclude(pk=self.pk)
+        if overlapping.exists():
+            raise ValidationError(_("توجد فترة جدول عمل أخرى متداخلة مع هذه الفترة."))
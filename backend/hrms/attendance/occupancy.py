@@ -0,0 +1,172 @@
+import threading
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+
+from employees.models import Employee
+from hrms.versions import get_version, bump_version, new_version
+from .models import Attendance
+
+OCCUPANCY_VERSION_KEY = "attendance:occupancy:version"
+# the board is reloaded at least this often, bounds what a write racing another process's bump can hide
+OCCUPANCY_RELOAD_SECONDS = 60
+
+
+def cairo_today():
+    return datetime.now(settings.CAIRO_TZ).date()
+
+
+def get_occupancy_version():
+    return get_version(OCCUPANCY_VERSION_KEY)
+
+
+def bump_occupancy_version():
+    version = new_version()
+    bump_version(OCCUPANCY_VERSION_KEY, version)
+    return version
+
+
+class OccupancyBoard:
+    """
+    Today's check-ins of this process: who is inside (checked in without a check-out) and who already left.
+
+    Writes of this process are applied directly, every write also bumps a shared version so the other worker
+    processes notice it and reload today's records from the database, which is also how the board starts.
+
+    Event streams of this process subscribe with an asyncio.Event that is set on every change of the board.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.date = None
+        self.version = None
+        self.loaded_at = None
+        # {asyncio.Event: its event loop}
+        self.listeners = {}
+        # bumped on every change, lets the event stream skip unchanged snapshots
+        self.revision = 0
+        self.check_ins = {}
+        self.inside = set()
+        self.names = {}
+
+    def load(self, today, version):
+        self.date, self.version, self.loaded_at = today, version, time.monotonic()
+        self.check_ins, self.inside, self.names = {}, set(), {}
+        rows = Attendance.objects.filter(date=today).values_list(
+            'employee_id', 'employee__name', 'check_in', 'check_out'
+        )
+        for employee_id, name, check_in, check_out in rows:
+            self.names[employee_id] = name
+            self.set(employee_id, check_in, check_out)
+        self.changed_locally()
+
+    def ensure_current(self):
+        today, version = cairo_today(), get_occupancy_version()
+        stale = self.loaded_at is None or time.monotonic() - self.loaded_at >= OCCUPANCY_RELOAD_SECONDS
+        if today != self.date or version != self.version or stale:
+            self.load(today, version)
+
+    def set(self, employee_id, check_in, check_out):
+        self.check_ins[employee_id] = check_in
+        if check_out is None:
+            self.inside.add(employee_id)
+        else:
+            self.inside.discard(employee_id)
+
+    def discard(self, employee_id):
+        self.check_ins.pop(employee_id, None)
+        self.inside.discard(employee_id)
+
+    def subscribe(self, event, loop):
+        """`event` is set (from any thread) whenever the board changes"""
+        with self.lock:
+            self.listeners[event] = loop
+
+    def unsubscribe(self, event):
+        with self.lock:
+            self.listeners.pop(event, None)
+
+    def changed_locally(self):
+        self.revision += 1
+        for event, loop in list(self.listeners.items()):
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # the loop is closed
+                self.listeners.pop(event, None)
+
+    def changed(self):
+        self.changed_locally()
+        previous = get_occupancy_version()
+        version = bump_occupancy_version()
+        # in sync unless another process wrote since the last load, then the next read reloads
+        self.version = version if previous == self.version else None
+
+    def apply(self, attendances):
+        today = cairo_today()
+        attendances = [attendance for attendance in attendances if attendance.date == today]
+        if not attendances:
+            return
+        with self.lock:
+            if self.date == today:
+                for attendance in attendances:
+                    self.set(attendance.employee_id, attendance.check_in, attendance.check_out)
+            self.changed()
+
+    def remove(self, attendances):
+        today = cairo_today()
+        attendances = [attendance for attendance in attendances if attendance.date == today]
+        if not attendances:
+            return
+        with self.lock:
+            if self.date == today:
+                for attendance in attendances:
+                    self.discard(attendance.employee_id)
+            self.changed()
+
+    def current_revision(self):
+        """Revision of the board, reloaded first if another process changed it"""
+        with self.lock:
+            self.ensure_current()
+            return self.revision
+
+    def snapshot(self):
+        with self.lock:
+            self.ensure_current()
+
+            missing = self.check_ins.keys() - self.names.keys()
+            if missing:
+                self.names.update(Employee.objects.filter(id__in=missing).values_list('id', 'name'))
+
+            inside = sorted(self.inside, key=lambda employee_id: (self.check_ins[employee_id], employee_id))
+            return {
+                'date': self.date.isoformat(),
+                'revision': self.revision,
+                'present': len(self.check_ins),
+                'inside_count': len(self.inside),
+                'left_count': len(self.check_ins) - len(self.inside),
+                'inside': [
+                    {
+                        'id': employee_id,
+                        'name': self.names.get(employee_id),
+                        'check_in': self.check_ins[employee_id].strftime('%H:%M'),
+                    }
+                    for employee_id in inside
+                ],
+            }
+
+
+board = OccupancyBoard()
+
+
+def record_attendances(attendances):
+    """Applies saved attendance records to the board once their transaction commits"""
+    attendances = list(attendances)
+    transaction.on_commit(lambda: board.apply(attendances))
+
+
+def forget_attendances(attendances):
+    attendances = list(attendances)
+    transaction.on_commit(lambda: board.remove(attendances))
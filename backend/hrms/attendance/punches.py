@@ -0,0 +1,181 @@
+import csv
+import io
+import json
+import re
+from datetime import datetime
+from itertools import groupby, islice
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import gettext_lazy as _
+
+from employees.models import Employee
+from .bulk import upsert_attendances
+from .models import Attendance
+
+
+EPOCH = re.compile(r'^\d+(\.\d+)?$')
+
+
+class PunchFileError(Exception):
+    pass
+
+
+def read_csv(file):
+    reader = csv.DictReader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+    try:
+        for row in reader:
+            yield reader.line_num, row
+    except UnicodeDecodeError:
+        raise PunchFileError(_("يجب أن يكون الملف بترميز UTF-8."))
+    except csv.Error:
+        raise PunchFileError(_("تعذرت قراءة ملف CSV."))
+
+
+def read_ndjson(file):
+    try:
+        for line_number, line in enumerate(io.TextIOWrapper(file, encoding='utf-8-sig'), start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_number, row if isinstance(row, dict) else {}
+    except UnicodeDecodeError:
+        raise PunchFileError(_("يجب أن يكون الملف بترميز UTF-8."))
+
+
+def read_punches(file, filename):
+    extension = Path(filename).suffix.lower()
+    if extension == '.csv':
+        return read_csv(file)
+    if extension in ('.ndjson', '.jsonl'):
+        return read_ndjson(file)
+    raise PunchFileError(_("صيغة الملف غير مدعومة، استخدم CSV أو NDJSON."))
+
+
+def parse_timestamp(value):
+    """
+    Local (Cairo) time of an ISO-8601 timestamp or a unix epoch (fractions allowed), naive timestamps are
+    already local. None when the value is not a time.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)) or (isinstance(value, str) and EPOCH.match(value.strip())):
+        try:
+            return datetime.fromtimestamp(float(value), settings.CAIRO_TZ).replace(tzinfo=None)
+        except (OverflowError, OSError, ValueError):
+            # out of the platform's range, or nan/inf from JSON
+            return None
+    try:
+        timestamp = parse_datetime(str(value).strip())
+    except ValueError:
+        return None
+    if timestamp is not None and timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(settings.CAIRO_TZ).replace(tzinfo=None)
+    return timestamp
+
+
+class PunchIngester:
+    """
+    Turns raw badge punches into attendance records.
+
+    Punches are sorted by employee and time, so one pass finds the first and last punch of every
+    (employee, date). They are merged with the stored record as earliest check-in and latest check-out,
+    which makes sending the same punches twice a no-op.
+    """
+
+    def __init__(self, batch_size=500):
+        self.batch_size = batch_size
+        self.total = 0
+        self.records = 0
+        self.errors = []
+
+    def run(self, rows):
+        """rows is an iterable of (line number, {'employee_id': ..., 'timestamp': ...})"""
+        punches = self.parse(rows)
+        punches = self.resolve_employees(punches)
+        punches.sort()
+
+        days = [
+            (employee_id, date, [punch[1].time() for punch in day])
+            for (employee_id, date), day in groupby(punches, key=lambda punch: (punch[0], punch[1].date()))
+        ]
+
+        days = iter(days)
+        with transaction.atomic():
+            while batch := list(islice(days, self.batch_size)):
+                self.upsert_batch(batch)
+
+        return self.report()
+
+    def report(self):
+        return {
+            'total': self.total,
+            'records': self.records,
+            'errors': sorted(self.errors, key=lambda error: error['row']),
+        }
+
+    def parse(self, rows):
+        punches = []
+        for line_number, row in rows:
+            self.total += 1
+            code = str(row.get('employee_id') or '').strip()
+            timestamp = parse_timestamp(row.get('timestamp') or '')
+
+            errors = {}
+            if not code:
+                errors['employee_id'] = [_("يرجى إدخال كود الموظف.")]
+            if timestamp is None:
+                errors['timestamp'] = [_("يرجى إدخال وقت صالح.")]
+            if errors:
+                self.errors.append({'row': line_number, 'errors': errors})
+                continue
+
+            punches.append((line_number, code, timestamp.replace(microsecond=0)))
+        return punches
+
+    def resolve_employees(self, punches):
+        codes = list({punch[1] for punch in punches})
+        employee_ids = {}
+        for start in range(0, len(codes), self.batch_size):
+            employee_ids.update(
+                Employee.objects.filter(employee_id__in=codes[start:start + self.batch_size])
+                .values_list('employee_id', 'id')
+            )
+
+        resolved = []
+        for line_number, code, timestamp in punches:
+            if code not in employee_ids:
+                self.errors.append({'row': line_number, 'errors': {'employee_id': [_("موظف غير موجود")]}})
+                continue
+            resolved.append((employee_ids[code], timestamp))
+        return resolved
+
+    def upsert_batch(self, batch):
+        employee_ids = {day[0] for day in batch}
+        dates = {day[1] for day in batch}
+        existing = {
+            (attendance.employee_id, attendance.date): attendance
+            for attendance in Attendance.objects.filter(employee_id__in=employee_ids, date__in=dates)
+            .only('employee_id', 'date', 'check_in', 'check_out')
+        }
+
+        attendances = []
+        for employee_id, date, times in batch:
+            stored = existing.get((employee_id, date))
+            if stored is not None:
+                times = times + [t for t in (stored.check_in, stored.check_out) if t is not None]
+            check_in, check_out = min(times), max(times)
+            attendances.append(Attendance(
+                employee_id=employee_id,
+                date=date,
+                check_in=check_in,
+                check_out=check_out if check_out != check_in else None,
+            ))
+
+        upsert_attendances(attendances)
+        self.records += len(attendances)
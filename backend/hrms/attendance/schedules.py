@@ -0,0 +1,101 @@
+from bisect import bisect_right
+from collections import defaultdict
+
+from .models import AttendanceSettings, ScheduleAssignment
+from .work_calendar import get_calendar_version, get_work_calendar
+
+# resolved (employee, department, date) entries kept per resolver before starting over
+MAX_RESOLVED = 100_000
+
+# resolver of this process by calendar version
+_resolvers = {}
+
+
+class Periods:
+    """Non overlapping assignment periods of one employee or department, sorted by start date"""
+
+    def __init__(self, assignments):
+        assignments = sorted(assignments, key=lambda assignment: assignment.start_date)
+        self.starts = [assignment.start_date for assignment in assignments]
+        self.assignments = assignments
+
+    def find(self, date):
+        index = bisect_right(self.starts, date) - 1
+        if index < 0:
+            return None
+        assignment = self.assignments[index]
+        if assignment.end_date is not None and assignment.end_date < date:
+            return None
+        return assignment.schedule_id
+
+
+class ScheduleResolver:
+    """
+    Schedule (AttendanceSettings) of an employee on a date: their own assignment, else their department's,
+    else the default schedule.
+
+    All assignments are loaded once, lookups are a binary search over the periods and are memoized.
+    """
+
+    def __init__(self):
+        self.schedules = {
+            schedule.pk: schedule
+            for schedule in AttendanceSettings.objects.prefetch_related('working_days').order_by('id')
+        }
+        self.default = next(iter(self.schedules.values()), None)
+
+        by_employee, by_department = defaultdict(list), defaultdict(list)
+        for assignment in ScheduleAssignment.objects.all():
+            if assignment.employee_id is not None:
+                by_employee[assignment.employee_id].append(assignment)
+            else:
+                by_department[assignment.department_id].append(assignment)
+        self.employee_periods = {key: Periods(value) for key, value in by_employee.items()}
+        self.department_periods = {key: Periods(value) for key, value in by_department.items()}
+
+        self.resolved = {}
+        self.calendars = {}
+
+    def resolve(self, employee_id, department_id, date):
+        key = (employee_id, department_id, date)
+        schedule = self.resolved.get(key, False)
+        if schedule is not False:
+            return schedule
+
+        schedule_id = None
+        if employee_id in self.employee_periods:
+            schedule_id = self.employee_periods[employee_id].find(date)
+        if schedule_id is None and department_id in self.department_periods:
+            schedule_id = self.department_periods[department_id].find(date)
+        schedule = self.schedules.get(schedule_id, self.default)
+
+        if len(self.resolved) >= MAX_RESOLVED:
+            self.resolved.clear()
+        self.resolved[key] = schedule
+        return schedule
+
+    def calendar(self, schedule):
+        key = schedule.pk if schedule is not None else None
+        if key not in self.calendars:
+            self.calendars[key] = get_work_calendar(schedule)
+        return self.calendars[key]
+
+    def any_workday(self, date):
+        return any(self.calendar(schedule).is_workday(date) for schedule in self.schedules.values())
+
+    def is_workday(self, employee_id, department_id, date):
+        schedule = self.resolve(employee_id, department_id, date)
+        return schedule is not None and self.calendar(schedule).is_workday(date)
+
+
+def get_schedule_resolver():
+    """
+    Resolver matching the current schedules, shared by the requests of this process.
+    Assignment, schedule and calendar changes bump the calendar version (see signals).
+    """
+    version = get_calendar_version()
+    resolver = _resolvers.get(version)
+    if resolver is None:
+        _resolvers.clear()
+        resolver = _resolvers[version] = ScheduleResolver()
+    return resolver
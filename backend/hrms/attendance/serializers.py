@@ -1,9 +1,19 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
-from .models import Attendance, AttendanceSettings
+from .models import Attendance, ArchivedAttendance, AttendanceSettings, Holiday, EmergencyDay, ScheduleAssignment
+
+
+class AttendanceIdentityField(serializers.HyperlinkedIdentityField):
+    """No url for archived records, they are listed with the history but can't be edited"""
+
+    def get_url(self, obj, view_name, request, format):
+        if isinstance(obj, ArchivedAttendance):
+            return None
+        return super().get_url(obj, view_name, request, format)
 
 
 class AttendanceReadSerializer(serializers.ModelSerializer):
-    url = serializers.HyperlinkedIdentityField(view_name='attendance-detail')
+    url = AttendanceIdentityField(view_name='attendance-detail')
     employee = serializers.SerializerMethodField()
     check_in = serializers.SerializerMethodField()
     check_out = serializers.SerializerMethodField()
@@ -47,3 +57,33 @@ class AttendanceSettingsWriteSerializer(serializers.ModelSerializer):
     class Meta:
         model = AttendanceSettings
         fields = "__all__"
+
+
+class HolidaySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Holiday
+        fields = ["id", "date", "name"]
+
+
+class EmergencyDaySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EmergencyDay
+        fields = ["id", "date", "name"]
+
+
+class ScheduleAssignmentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ScheduleAssignment
+        fields = ["id", "schedule", "employee", "department", "start_date", "end_date"]
+
+    def validate(self, attrs):
+        fields = ["schedule", "employee", "department", "start_date", "end_date"]
+        assignment = ScheduleAssignment(
+            pk=getattr(self.instance, "pk", None),
+            **{field: attrs.get(field, getattr(self.instance, field, None)) for field in fields}
+        )
+        try:
+            assignment.clean()
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.message_dict if hasattr(e, "error_dict") else e.messages)
+        return attrs
@@ -1,9 +1,15 @@
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_migrate, pre_save, post_save, post_delete, m2m_changed
+from django.db import transaction
 from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 from datetime import time
 
-from .models import Day, AttendanceSettings
+from .models import Day, AttendanceSettings, Attendance, Absence, Holiday, EmergencyDay, \
+    ScheduleAssignment
+from .absences import refresh_absences
+from .archive import archiving
+from .occupancy import record_attendances, forget_attendances
+from .work_calendar import invalidate_calendar
 
 
 @receiver(post_migrate)
@@ -27,3 +33,52 @@ def create_default_data(sender, **kwargs):
             "sunday", "monday", "tuesday", "wednesday"
         ])
         attendance.working_days.set(working_days)
+
+
+@receiver(pre_save, sender=Attendance)
+def remember_absence_key(sender, instance, **kwargs):
+    instance._absence_key = None
+    if instance.pk and not instance._state.adding:
+        instance._absence_key = Attendance.objects.filter(pk=instance.pk).values_list("date", "employee_id").first()
+
+
+@receiver(post_save, sender=Attendance)
+def clear_absence(sender, instance, **kwargs):
+    Absence.objects.filter(date=instance.date, employee_id=instance.employee_id).delete()
+
+    # a record moved to another day or employee leaves its old day without attendance
+    previous = getattr(instance, "_absence_key", None)
+    if previous is not None and previous != (instance.date, instance.employee_id):
+        date, employee_id = previous
+        refresh_absences(date, [employee_id])
+
+
+@receiver(post_save, sender=Attendance)
+def update_occupancy(sender, instance, **kwargs):
+    record_attendances([instance])
+
+
+@receiver(post_delete, sender=Attendance)
+def remove_occupancy(sender, instance, **kwargs):
+    forget_attendances([instance])
+
+
+@receiver(post_delete, sender=Attendance)
+def restore_absence(sender, instance, **kwargs):
+    # a deleted record leaves its day without attendance, unless it was moved to the archive
+    if not archiving.get():
+        date, employee_id = instance.date, instance.employee_id
+        transaction.on_commit(lambda: refresh_absences(date, [employee_id]))
+
+
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+@receiver(post_save, sender=EmergencyDay)
+@receiver(post_delete, sender=EmergencyDay)
+@receiver(post_save, sender=AttendanceSettings)
+@receiver(post_delete, sender=AttendanceSettings)
+@receiver(m2m_changed, sender=AttendanceSettings.working_days.through)
+@receiver(post_save, sender=ScheduleAssignment)
+@receiver(post_delete, sender=ScheduleAssignment)
+def invalidate_work_calendar(sender, **kwargs):
+    invalidate_calendar()
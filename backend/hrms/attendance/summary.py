@@ -0,0 +1,77 @@
+from collections import defaultdict
+from datetime import time
+from typing import Optional
+
+from .models import AttendanceSettings
+
+
+def to_seconds(value: Optional[time]):
+    if value is None:
+        return None
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+class AttendanceSummary:
+    """
+    Lateness, early leave and overtime of many attendance records against one schedule.
+
+    The schedule is read once and the records are turned into columns of check-in and check-out seconds,
+    every metric is then computed with a single pass over the columns.
+    """
+
+    def __init__(self, attendance_settings: AttendanceSettings):
+        self.check_in = to_seconds(attendance_settings.check_in)
+        self.check_out = to_seconds(attendance_settings.check_out)
+        self.grace_period = attendance_settings.grace_period * 60
+
+    def late_minutes(self, check_ins):
+        start, grace = self.check_in, self.grace_period
+        return [(seconds - start) / 60 if seconds - start > grace else 0 for seconds in check_ins]
+
+    def early_leave_minutes(self, check_outs):
+        end = self.check_out
+        return [(end - seconds) / 60 if seconds is not None and end - seconds >= 60 else 0 for seconds in check_outs]
+
+    def extra_minutes(self, check_outs):
+        end = self.check_out
+        return [(seconds - end) / 60 if seconds is not None and seconds > end else None for seconds in check_outs]
+
+    def measure(self, records):
+        """(late, early leave, extra) minute columns of the records"""
+        check_ins = [to_seconds(record.check_in) for record in records]
+        check_outs = [to_seconds(record.check_out) for record in records]
+        return self.late_minutes(check_ins), self.early_leave_minutes(check_outs), self.extra_minutes(check_outs)
+
+    def summarize(self, records):
+        """records are Attendance instances with their employee selected"""
+        late, early, extra = self.measure(records)
+
+        return [
+            {
+                "employee": record.employee.name,
+                "check_in": record.check_in,
+                "check_out": record.check_out,
+                "deductions": late[i] + early[i],
+                "extra": extra[i],
+            }
+            for i, record in enumerate(records)
+        ]
+
+
+def group_by_schedule(records, resolver):
+    """{schedule: indexes of its records}, records have their employee selected"""
+    groups = defaultdict(list)
+    for index, record in enumerate(records):
+        schedule = resolver.resolve(record.employee_id, record.employee.department_id, record.date)
+        groups[schedule].append(index)
+    return groups
+
+
+def summarize_by_schedule(records, resolver):
+    """Summary of records that may follow different schedules, each schedule's records are computed together"""
+    results = [None] * len(records)
+    for schedule, indexes in group_by_schedule(records, resolver).items():
+        rows = AttendanceSummary(schedule).summarize([records[index] for index in indexes])
+        for index, row in zip(indexes, rows):
+            results[index] = row
+    return results
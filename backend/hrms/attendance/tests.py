@@ -1,3 +1,80 @@
+import base64
+import json
+from datetime import date, time
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from employees.models import Department, Employee
+from users.models import User
+from .models import Attendance
+
+
+def encode_cursor(position, reverse=False):
+    payload = json.dumps({'p': position, 'r': reverse}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+class AttendanceCursorPaginationTests(TestCase):
+    url = '/api/attendance/attendance/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', 'secret', phone='0100', national_id='100')
+        employee = Employee.objects.create(
+            name='Employee', employee_id='E1', national_id='200', phone='0200', birth_date=date(1990, 1, 1),
+            department=Department.objects.create(name='Department'), created_by=cls.user,
+        )
+        for day in range(1, 4):
+            Attendance.objects.create(employee=employee, date=date(2026, 1, day), check_in=time(9, 0))
+
+    def setUp(self):
+        self.client = APIClient(SERVER_NAME='localhost')
+        self.client.force_authenticate(self.user)
+
+    def test_cursor_pages(self):
+        response = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['date'] for row in response.data['data']], ['2026-01-03', '2026-01-02'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([row['date'] for row in response.data['data']], ['2026-01-01'])
+        self.assertIsNone(response.data['next'])
+
+    def test_tampered_cursor(self):
+        for position in (['notadate', 1], ['2026-01-02', 'notanid'], [['2026-01-02'], {}]):
+            response = self.client.get(self.url, {'pagination': 'cursor', 'cursor': encode_cursor(position)})
+            self.assertEqual(response.status_code, 404, position)
+
+        response = self.client.get(self.url, {'pagination': 'cursor', 'cursor': 'not base64'})
+        self.assertEqual(response.status_code, 404)
+
+
+class AttendanceSummaryTests(TestCase):
+    url = '/api/attendance/get-attendance-summary/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', 'secret', phone='0100', national_id='100')
+        employee = Employee.objects.create(
+            name='Employee', employee_id='E1', national_id='200', phone='0200', birth_date=date(1990, 1, 1),
+            department=Department.objects.create(name='Department'), created_by=cls.user,
+        )
+        Attendance.objects.create(employee=employee, date=date(2026, 1, 1), check_in=time(10, 30))
+
+    def setUp(self):
+        self.client = APIClient(SERVER_NAME='localhost')
+        self.client.force_authenticate(self.user)
+
+    def test_summary_pages(self):
+        for params in ({}, {'pagination': 'cursor'}):
+            response = self.client.get(self.url, {'date': '2026-01-01', **params})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['count'], 1)
+            self.assertEqual(response.data['page'], 1)
+            self.assertEqual(response.data['data'][0]['employee'], 'Employee')
 
-# Create your tests here.
+    def test_summary_without_pagination(self):
+        response = self.client.get(self.url, {'date': '2026-01-01', 'no_pagination': 'true'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
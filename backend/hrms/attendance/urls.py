@@ -1,13 +1,25 @@
 from rest_framework.routers import DefaultRouter
-from .views import AttendanceViewSet, update_day_attendance, get_attendance_summary, AttendanceSettingsView
+from .views import AttendanceViewSet, HolidayViewSet, EmergencyDayViewSet, ScheduleViewSet, ScheduleAssignmentViewSet, \
+    update_day_attendance, get_attendance_summary, AttendanceSettingsView, ingest_punches, get_attendance_matrix, \
+    get_absence_stats, get_monthly_report, get_occupancy, occupancy_stream
 from django.urls import path, include
 
 router = DefaultRouter()
 router.register('attendance', AttendanceViewSet, basename='attendance')
+router.register('holidays', HolidayViewSet, basename='holiday')
+router.register('emergency-days', EmergencyDayViewSet, basename='emergency-day')
+router.register('schedules', ScheduleViewSet, basename='schedule')
+router.register('schedule-assignments', ScheduleAssignmentViewSet, basename='schedule-assignment')
 
 urlpatterns = [
     path('', include(router.urls)),
     path('update-day-attendance/', update_day_attendance, name="update-day-attendance"),
+    path('ingest-punches/', ingest_punches, name="ingest-punches"),
+    path('attendance-matrix/', get_attendance_matrix, name="attendance-matrix"),
+    path('absence-stats/', get_absence_stats, name="absence-stats"),
+    path('monthly-report/', get_monthly_report, name="monthly-report"),
+    path('occupancy/', get_occupancy, name="occupancy"),
+    path('occupancy/stream/', occupancy_stream, name="occupancy-stream"),
     path('get-attendance-summary/', get_attendance_summary, name="get-attendance-summary"),
     path('attendance-settings/', AttendanceSettingsView.as_view(), name="get-attendance-settings"),
 ]
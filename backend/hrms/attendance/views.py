@@ -1,19 +1,61 @@
-from datetime import datetime, timedelta, time
-from typing import Optional
+import asyncio
+import json
+import time
+from datetime import timedelta
 
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated
+
+from authentication.authentication import BaseAuthentication
 from hrms.rest_framework_utils.custom_pagination import CustomPageNumberPagination
-from .models import Attendance, AttendanceSettings
+from .models import Attendance, AttendanceSettings, Holiday, EmergencyDay, ScheduleAssignment
+from .summary import summarize_by_schedule
+from .schedules import get_schedule_resolver
+from .bulk import DayAttendanceWriter
+from .punches import PunchIngester, PunchFileError, read_punches
+from .matrix import build_attendance_matrix, MAX_MATRIX_DAYS
+from .absences import absence_stats
+from .archive import monthly_report, add_months, attendance_queryset, MAX_REPORT_MONTHS
+from .occupancy import board
 from .serializers import AttendanceWriteSerializer, AttendanceReadSerializer, AttendanceSettingsReadSerializer, \
-    AttendanceSettingsWriteSerializer
-from rest_framework.decorators import api_view
+    AttendanceSettingsWriteSerializer, HolidaySerializer, EmergencyDaySerializer, ScheduleAssignmentSerializer
+from rest_framework.decorators import api_view, parser_classes
+from rest_framework.parsers import MultiPartParser
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status, viewsets
+from rest_framework import status, viewsets, serializers
 from django.utils.translation import gettext_lazy as _
 
 
+def get_int_param(request, name):
+    """Integer query parameter or None, a malformed value is answered with a 400"""
+    value = request.query_params.get(name, None)
+    if value is None:
+        return None
+    try:
+        return serializers.IntegerField().to_internal_value(value)
+    except serializers.ValidationError as e:
+        raise serializers.ValidationError({name: e.detail})
+
+
+def get_date_param(request, name):
+    """Date query parameter or None, a malformed value is answered with a 400"""
+    value = request.query_params.get(name, None)
+    if value is None:
+        return None
+    try:
+        return serializers.DateField().to_internal_value(value)
+    except serializers.ValidationError as e:
+        raise serializers.ValidationError({name: e.detail})
+
+
 class AttendanceViewSet(viewsets.ModelViewSet):
-    pagination_class = None
+    # unpaginated unless ?pagination=cursor (history) or ?pagination=page is requested
+    pagination_class = CustomPageNumberPagination
+    pagination_mode = 'none'
+    cursor_ordering = ('-date', '-id')
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -21,53 +63,52 @@ class AttendanceViewSet(viewsets.ModelViewSet):
         return AttendanceReadSerializer
 
     def get_queryset(self):
-        queryset = Attendance.objects.all()
-        date = self.request.query_params.get("date", None)
+        date = get_date_param(self.request, "date")
+        employee = get_int_param(self.request, "employee")
+        # lists read the archived months as well, the other actions only the editable attendance table
+        if self.action == 'list':
+            queryset = attendance_queryset(date)
+        else:
+            queryset = Attendance.objects.all()
+
+        queryset = queryset.select_related('employee')
         if date is not None:
             queryset = queryset.filter(date=date)
+        if employee is not None:
+            queryset = queryset.filter(employee_id=employee)
         return queryset
 
 
-def calculate_deduction(checkin: time, checkout: Optional[time]):
-    today = datetime.today().date()
-    attendance_settings = AttendanceSettings.objects.first()
-
-    checkin_date = datetime.combine(today, checkin)
-    checkout_date = datetime.combine(today, checkout) if checkout else None
-    grace_period = timedelta(minutes=15)
+class HolidayViewSet(viewsets.ModelViewSet):
+    queryset = Holiday.objects.all()
+    serializer_class = HolidaySerializer
+    pagination_mode = 'none'
 
-    standard_checkin = datetime.combine(today, attendance_settings.check_in)
-    standard_checkout = datetime.combine(today, attendance_settings.check_out)
 
-    # calculate late minutes and compare with grace period
-    late_minutes = 0
-    if checkin_date - standard_checkin > grace_period:
-        late_delta = checkin_date - standard_checkin
-        late_minutes = late_delta.total_seconds() / 60
+class EmergencyDayViewSet(viewsets.ModelViewSet):
+    queryset = EmergencyDay.objects.all()
+    serializer_class = EmergencyDaySerializer
+    pagination_mode = 'none'
 
-    # check if there early leave minutes
-    early_leave = 0
-    if checkout and standard_checkout - checkout_date >= timedelta(minutes=1):
-        early_delta = standard_checkout - checkout_date
-        early_leave = early_delta.total_seconds() / 60
 
-    return late_minutes + early_leave
+class ScheduleViewSet(viewsets.ModelViewSet):
+    queryset = AttendanceSettings.objects.prefetch_related('working_days')
+    serializer_class = AttendanceSettingsWriteSerializer
+    pagination_mode = 'none'
 
 
-def calculate_extra(check_out: Optional[time]):
-    if not check_out:
-        return None
-
-    today = datetime.today().date()
-    attendance_settings = AttendanceSettings.objects.first()
-
-    checkout_date = datetime.combine(today, check_out)
-    standard_checkout = datetime.combine(today, attendance_settings.check_out)
+class ScheduleAssignmentViewSet(viewsets.ModelViewSet):
+    serializer_class = ScheduleAssignmentSerializer
 
-    if checkout_date - standard_checkout > timedelta(minutes=0):
-        extra_delta = checkout_date - standard_checkout
-        return extra_delta.total_seconds() / 60
-    return None
+    def get_queryset(self):
+        queryset = ScheduleAssignment.objects.all()
+        employee = get_int_param(self.request, "employee")
+        department = get_int_param(self.request, "department")
+        if employee is not None:
+            queryset = queryset.filter(employee_id=employee)
+        if department is not None:
+            queryset = queryset.filter(department_id=department)
+        return queryset
 
 
 @api_view(['GET'])
@@ -76,32 +117,88 @@ def get_attendance_summary(request):
     if date is None:
         return Response({"detail": _('يجب توفير تاريخ اليوم')}, status=status.HTTP_400_BAD_REQUEST)
 
-    attendances = Attendance.objects.filter(date=date)
+    try:
+        date = serializers.DateField().to_internal_value(date)
+    except serializers.ValidationError as e:
+        return Response({"detail": e.detail[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+    resolver = get_schedule_resolver()
+    if resolver.default is None:
+        return Response(status=status.HTTP_501_NOT_IMPLEMENTED)
+
+    attendances = (
+        attendance_queryset(date).filter(date=date)
+        .select_related('employee')
+        .only('date', 'check_in', 'check_out', 'employee__name', 'employee__department_id')
+    )
 
     paginator = CustomPageNumberPagination()
     paginator.page_size = 10
     paginated_result = paginator.paginate_queryset(attendances, request)
 
-    records = [{
-        "employee": record.employee.name,
-        "check_in": record.check_in,
-        "check_out": record.check_out,
-        "deductions": calculate_deduction(record.check_in, record.check_out),
-        "extra": calculate_extra(record.check_out)
-    }
-        for record in paginated_result]
+    # ?no_pagination=true summarizes the whole day
+    if paginated_result is None:
+        return Response(summarize_by_schedule(list(attendances), resolver), status=status.HTTP_200_OK)
+
+    return paginator.get_paginated_response(summarize_by_schedule(paginated_result, resolver))
+
+
+@api_view(['GET'])
+def get_attendance_matrix(request):
+    """?month=YYYY-MM or ?start=YYYY-MM-DD&end=YYYY-MM-DD, optionally filtered by ?department="""
+    date_field = serializers.DateField()
+    month = request.query_params.get("month", None)
+    try:
+        if month is not None:
+            start = date_field.to_internal_value(f"{month}-01")
+            end = (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+        else:
+            start = date_field.to_internal_value(request.query_params.get("start", ""))
+            end = date_field.to_internal_value(request.query_params.get("end", ""))
+    except serializers.ValidationError:
+        return Response({"detail": _('يجب توفير شهر أو فترة صحيحة')}, status=status.HTTP_400_BAD_REQUEST)
+
+    if end < start or (end - start).days >= MAX_MATRIX_DAYS:
+        return Response(
+            {"detail": _('يجب ألا تتجاوز الفترة {days} يومًا').format(days=MAX_MATRIX_DAYS)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    department = get_int_param(request, "department")
+    return Response(build_attendance_matrix(start, end, department), status=status.HTTP_200_OK)
+
 
-    data = {
-        'total_pages': paginator.page.paginator.num_pages,
-        'page': paginator.page.number,
-        'count': paginator.page.paginator.count,
-        'next': paginator.get_next_link(),
-        'previous': paginator.get_previous_link(),
-        "data": records,
+@api_view(['GET'])
+def get_absence_stats(request):
+    date_field = serializers.DateField()
+    try:
+        start = date_field.to_internal_value(request.query_params.get("start", ""))
+        end = date_field.to_internal_value(request.query_params.get("end", ""))
+    except serializers.ValidationError:
+        return Response({"detail": _('يجب توفير فترة صحيحة')}, status=status.HTTP_400_BAD_REQUEST)
+
+    department = get_int_param(request, "department")
+    return Response(absence_stats(start, end, department), status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def get_monthly_report(request):
+    """?start=YYYY-MM&end=YYYY-MM, optionally filtered by ?department="""
+    date_field = serializers.DateField()
+    try:
+        start = date_field.to_internal_value(f"{request.query_params.get('start', '')}-01")
+        end = date_field.to_internal_value(f"{request.query_params.get('end', '')}-01")
+    except serializers.ValidationError:
+        return Response({"detail": _('يجب توفير فترة صحيحة')}, status=status.HTTP_400_BAD_REQUEST)
 
-    }
+    if end < start or add_months(start, MAX_REPORT_MONTHS) <= end:
+        return Response(
+            {"detail": _('يجب ألا تتجاوز الفترة {months} شهرًا').format(months=MAX_REPORT_MONTHS)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
-    return Response(data, status=status.HTTP_200_OK)
+    department = get_int_param(request, "department")
+    return Response(monthly_report(start, end, department), status=status.HTTP_200_OK)
 
 
 @api_view(["POST"])
@@ -112,18 +209,104 @@ def update_day_attendance(request):
     if date is None:
         return Response({"detail": _('يجب توفير تاريخ اليوم')}, status=status.HTTP_400_BAD_REQUEST)
 
-    for record in records:
-        if record["saved"]:
-            attendance = Attendance.objects.get(pk=record["id"])
-            serializer = AttendanceWriteSerializer(attendance, data=record, partial=True, context={"request": request})
-            if serializer.is_valid():
-                serializer.save()
-        else:
-            serializer = AttendanceWriteSerializer(data={**record, "date": date}, context={"request": request})
-            if serializer.is_valid():
-                serializer.save()
+    try:
+        date = serializers.DateField().to_internal_value(date)
+    except serializers.ValidationError as e:
+        return Response({"detail": e.detail[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not isinstance(records, list):
+        return Response({"detail": _('يجب إرسال السجلات في قائمة')}, status=status.HTTP_400_BAD_REQUEST)
+
+    results = DayAttendanceWriter(date).save(records)
+    return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+@api_view(["POST"])
+@parser_classes([MultiPartParser])
+def ingest_punches(request):
+    file = request.FILES.get('file')
+    if file is None:
+        return Response({'file': [_('يرجى رفع ملف البصمات')]}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        report = PunchIngester().run(read_punches(file, file.name))
+    except PunchFileError as e:
+        return Response({'file': [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(report, status=status.HTTP_200_OK)
 
-    return Response()
+
+@api_view(['GET'])
+def get_occupancy(request):
+    return Response(board.snapshot(), status=status.HTTP_200_OK)
+
+
+# ---------------------------
+# Occupancy event stream, served by the ASGI application (e.g. `uvicorn hrms.asgi:application`)
+# ---------------------------
+# writes of this process wake the stream at once, writes of other processes are noticed by this poll
+OCCUPANCY_POLL_SECONDS = 5
+OCCUPANCY_HEARTBEAT_SECONDS = 15
+# connections are closed after a while, EventSource reconnects by itself
+OCCUPANCY_STREAM_SECONDS = 10 * 60
+# reconnection delay of the single snapshot answered outside ASGI
+OCCUPANCY_RETRY_SECONDS = 5
+
+
+def occupancy_event(snapshot):
+    return f"event: occupancy\ndata: {json.dumps(snapshot, ensure_ascii=False)}\n\n"
+
+
+async def occupancy_events():
+    yield f"retry: {OCCUPANCY_RETRY_SECONDS * 1000}\n\n"
+    changed = asyncio.Event()
+    board.subscribe(changed, asyncio.get_running_loop())
+    try:
+        started = last_sent = time.monotonic()
+        revision = None
+        while time.monotonic() - started < OCCUPANCY_STREAM_SECONDS:
+            changed.clear()
+            if await sync_to_async(board.current_revision)() != revision:
+                snapshot = await sync_to_async(board.snapshot)()
+                revision = snapshot['revision']
+                last_sent = time.monotonic()
+                yield occupancy_event(snapshot)
+            elif time.monotonic() - last_sent >= OCCUPANCY_HEARTBEAT_SECONDS:
+                last_sent = time.monotonic()
+                yield ": ping\n\n"
+
+            try:
+                await asyncio.wait_for(changed.wait(), OCCUPANCY_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        board.unsubscribe(changed)
+
+
+async def occupancy_stream(request):
+    """Server-Sent Events of the occupancy board, a new snapshot is pushed whenever it changes"""
+    try:
+        authenticated = await sync_to_async(BaseAuthentication().authenticate)(request)
+    except AuthenticationFailed as e:
+        return JsonResponse({'detail': str(e.detail)}, status=status.HTTP_401_UNAUTHORIZED)
+    if authenticated is None:
+        return JsonResponse({'detail': str(NotAuthenticated.default_detail)}, status=status.HTTP_401_UNAUTHORIZED)
+
+    if not isinstance(request, ASGIRequest):
+        # a WSGI worker would hold the connection for the whole stream and send it at the end,
+        # answer one snapshot instead, EventSource reconnects after the retry delay
+        snapshot = await sync_to_async(board.snapshot)()
+        response = HttpResponse(
+            f"retry: {OCCUPANCY_RETRY_SECONDS * 1000}\n\n{occupancy_event(snapshot)}",
+            content_type='text/event-stream',
+        )
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+    response = StreamingHttpResponse(occupancy_events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
 class AttendanceSettingsView(APIView):
@@ -0,0 +1,119 @@
+from array import array
+from datetime import date, timedelta
+
+from django.db import transaction
+
+from hrms.versions import get_version, bump_version
+
+from .models import AttendanceSettings, Holiday, EmergencyDay
+
+CALENDAR_VERSION_KEY = "attendance:calendar:version"
+
+# names of Day rows in date.weekday() order
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+# built calendars of this process by (version, schedule id)
+_calendars = {}
+
+
+class YearCalendar:
+    """Working day flags of one year with their prefix sums"""
+
+    def __init__(self, year, weekdays, closed_days):
+        self.first = date(year, 1, 1).toordinal()
+        length = date(year, 12, 31).toordinal() - self.first + 1
+
+        self.bitmap = bytearray(length)
+        self.prefix = array('H', [0]) * (length + 1)
+        for offset in range(length):
+            day = date.fromordinal(self.first + offset)
+            self.bitmap[offset] = day.weekday() in weekdays and day not in closed_days
+            self.prefix[offset + 1] = self.prefix[offset] + self.bitmap[offset]
+
+    def is_workday(self, day):
+        return bool(self.bitmap[day.toordinal() - self.first])
+
+    def count(self, start, end):
+        """Working days in [start, end], both in this year"""
+        return self.prefix[end.toordinal() - self.first + 1] - self.prefix[start.toordinal() - self.first]
+
+
+class WorkCalendar:
+    """
+    Working days of a schedule: its weekly working days minus holidays and emergency days.
+
+    Years are built on first use, then every lookup is an index into the year bitmap or its prefix sums.
+    """
+
+    def __init__(self, weekdays, closed_days):
+        self.weekdays = frozenset(weekdays)
+        self.closed_days = frozenset(closed_days)
+        self.years = {}
+
+    def year(self, year):
+        calendar = self.years.get(year)
+        if calendar is None:
+            calendar = self.years[year] = YearCalendar(year, self.weekdays, self.closed_days)
+        return calendar
+
+    def is_workday(self, day):
+        return self.year(day.year).is_workday(day)
+
+    def count_workdays(self, start, end):
+        """Working days in [start, end]"""
+        if end < start:
+            return 0
+        if start.year == end.year:
+            return self.year(start.year).count(start, end)
+
+        total = self.year(start.year).count(start, date(start.year, 12, 31))
+        for year in range(start.year + 1, end.year):
+            total += self.year(year).prefix[-1]
+        return total + self.year(end.year).count(date(end.year, 1, 1), end)
+
+    def workdays(self, start, end):
+        day = start
+        while day <= end:
+            if self.is_workday(day):
+                yield day
+            day += timedelta(days=1)
+
+
+def get_calendar_version():
+    return get_version(CALENDAR_VERSION_KEY)
+
+
+def _invalidate():
+    _calendars.clear()
+    bump_version(CALENDAR_VERSION_KEY)
+
+
+def invalidate_calendar():
+    """Bump the version once the transaction commits so every process rebuilds its calendars on next use"""
+    transaction.on_commit(_invalidate)
+
+
+def build_calendar(schedule):
+    names = {day.name for day in schedule.working_days.all()} if schedule is not None else set()
+    weekdays = {weekday for weekday, name in enumerate(WEEKDAYS) if name in names}
+    closed_days = set(Holiday.objects.values_list('date', flat=True))
+    closed_days.update(EmergencyDay.objects.values_list('date', flat=True))
+    return WorkCalendar(weekdays, closed_days)
+
+
+def get_work_calendar(schedule=None):
+    """
+    Calendar of `schedule` (the default attendance settings if not given).
+
+    Checks the shared version once, callers keep the calendar for the duration of a request or a job.
+    """
+    if schedule is None:
+        schedule = AttendanceSettings.objects.first()
+    key = (get_calendar_version(), schedule.pk if schedule is not None else None)
+
+    calendar = _calendars.get(key)
+    if calendar is None:
+        if len(_calendars) > 32:
+            _calendars.clear()
+        calendar = _calendars[key] = build_calendar(schedule)
+    return calendar
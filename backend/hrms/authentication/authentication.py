@@ -1,9 +1,11 @@
-from django.utils import timezone
-
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework.authentication import CSRFCheck
 from rest_framework import exceptions
 
+from .last_seen import tracker
+from .user_cache import user_cache
+
 
 def enforce_csrf(request):
     """
@@ -20,6 +22,13 @@ def enforce_csrf(request):
 class BaseAuthentication(JWTAuthentication):
     """Custom authentication class"""
 
+    def get_user(self, validated_token):
+        return user_cache.get(
+            validated_token.get(api_settings.USER_ID_CLAIM),
+            validated_token.get(api_settings.JTI_CLAIM),
+            lambda: super(BaseAuthentication, self).get_user(validated_token),
+        )
+
     def authenticate(self, request):
         # First try to get the token from the Authorization header
         header = self.get_header(request)
@@ -47,8 +56,7 @@ class BaseAuthentication(JWTAuthentication):
         if not auth_user.is_active:
             return None
 
-        if auth_user is not None:
-            auth_user.last_login = timezone.now()
-            auth_user.save(update_fields=['last_login'])
+        # written in batches, see last_seen
+        tracker.touch(auth_user)
 
-        return self.get_user(validated_token), validated_token
+        return auth_user, validated_token
@@ -0,0 +1,82 @@
+import atexit
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# users per UPDATE, keeps the statement under SQLite's variable limit
+FLUSH_BATCH_SIZE = 300
+
+
+class LastSeenTracker:
+    """
+    Write-behind last_login of the API requests.
+
+    Requests only record the time in memory (once per granularity per user), the pending times are written
+    with one UPDATE per batch at most every flush interval, and on shutdown.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.last_flush = time.monotonic()
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'LAST_SEEN_FLUSH_SECONDS', 60)
+
+    @property
+    def granularity(self):
+        return timedelta(seconds=getattr(settings, 'LAST_SEEN_GRANULARITY_SECONDS', 60))
+
+    def touch(self, user):
+        now = timezone.now()
+        with self.lock:
+            seen = self.pending.get(user.pk, user.last_login)
+            if seen is None or now - seen >= self.granularity:
+                self.pending[user.pk] = seen = now
+            due = bool(self.pending) and time.monotonic() - self.last_flush >= self.flush_interval
+        user.last_login = seen
+
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.last_flush = time.monotonic()
+        if not pending:
+            return 0
+
+        User = get_user_model()
+        items = list(pending.items())
+        try:
+            for start in range(0, len(items), FLUSH_BATCH_SIZE):
+                batch = items[start:start + FLUSH_BATCH_SIZE]
+                User.objects.filter(pk__in=[user_id for user_id, _ in batch]).update(
+                    last_login=Case(
+                        *[When(pk=user_id, then=Value(seen)) for user_id, seen in batch],
+                        output_field=DateTimeField(),
+                    )
+                )
+        except DatabaseError:
+            logger.exception("Could not write last_login of %d users", len(pending))
+            # keep them for the next flush unless the user was seen again meanwhile
+            with self.lock:
+                for user_id, seen in pending.items():
+                    self.pending.setdefault(user_id, seen)
+            return 0
+        return len(pending)
+
+
+tracker = LastSeenTracker()
+
+atexit.register(tracker.flush)
@@ -0,0 +1,36 @@
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from users.models import User
+from users.permissions import permissions_version_changed
+from .user_cache import invalidate_user_cache
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields, **kwargs):
+    # the last_login of a sign in changes nothing the authentication depends on
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_user_cache()
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Permission)
+def permissions_deleted(sender, **kwargs):
+    invalidate_user_cache()
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def permissions_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_user_cache()
+
+
+@receiver(permissions_version_changed)
+def permissions_version_moved(sender, **kwargs):
+    # cached users carry the permissions version their permissions are looked up with
+    invalidate_user_cache()
@@ -0,0 +1,67 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from hrms.versions import get_version, bump_version_on_commit
+
+USER_CACHE_VERSION_KEY = "authentication:users:version"
+
+
+def get_user_cache_version():
+    return get_version(USER_CACHE_VERSION_KEY)
+
+
+def invalidate_user_cache():
+    """Bump the version once the transaction commits so every process drops its cached users (see signals)"""
+    bump_version_on_commit(USER_CACHE_VERSION_KEY)
+
+
+class UserCache:
+    """
+    Authenticated users of this process by (user id, token jti), least recently used entries are dropped
+    past `AUTH_USER_CACHE_SIZE` and every entry expires after `AUTH_USER_CACHE_SECONDS`.
+
+    Lookups hand out copies so a request can't change the cached user of the next one.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.version = None
+
+    @property
+    def maxsize(self):
+        return getattr(settings, 'AUTH_USER_CACHE_SIZE', 1024)
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'AUTH_USER_CACHE_SECONDS', 60)
+
+    def get(self, user_id, jti, load):
+        """Cached user of the token, `load()` fetches it on a miss"""
+        key = (user_id, jti)
+        version = get_user_cache_version()
+        with self.lock:
+            if version != self.version:
+                self.entries.clear()
+                self.version = version
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                return copy.copy(entry[1])
+
+        user = load()
+        with self.lock:
+            # the version moved on while loading, the loaded user may already be stale
+            if version == self.version:
+                self.entries[key] = (time.monotonic() + self.ttl, copy.copy(user))
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+        return user
+
+
+user_cache = UserCache()
@@ -16,6 +16,9 @@ from users.serializers import UserSerializer
 from rest_framework_simplejwt.serializers import TokenVerifySerializer
 from rest_framework_simplejwt.exceptions import InvalidToken
 from rest_framework_simplejwt.tokens import UntypedToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .user_cache import user_cache
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=4),
@@ -101,27 +104,25 @@ class CustomTokenRefreshView(TokenRefreshView):
 
 class CustomTokenVerifySerializer(TokenVerifySerializer):
     def validate(self, attrs):
-        token = attrs["token"]
-
-        # Validate token structure & expiry
-        validated_data = super().validate(attrs)
-
-        # Decode token
-        untyped_token = UntypedToken(token)
+        # Validate token signature & expiry, decoded once
+        untyped_token = UntypedToken(attrs["token"])
         user_id = untyped_token.payload.get("user_id")
 
         if not user_id:
             raise InvalidToken("Token does not contain user_id")
 
-        try:
-            user = User.objects.get(id=user_id)
-        except User.DoesNotExist:
-            raise InvalidToken("User does not exist")
+        def load_user():
+            try:
+                return User.objects.get(id=user_id)
+            except User.DoesNotExist:
+                raise InvalidToken("User does not exist")
+
+        user = user_cache.get(user_id, untyped_token.get(api_settings.JTI_CLAIM), load_user)
 
         if not user.is_active:
             raise InvalidToken("User account is inactive")
 
-        return validated_data
+        return {}
 
 class CustomTokenVerifyView(TokenVerifyView):
     serializer_class = CustomTokenVerifySerializer
@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Employee, Department
+from .models import Employee, Department, PerformanceScore, PendingFileDeletion
 
 admin.site.register(Employee)
 admin.site.register(Department)
+admin.site.register(PerformanceScore)
+admin.site.register(PendingFileDeletion)
@@ -0,0 +1,79 @@
+from datetime import timedelta
+
+from django.db.models import Count, Q, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from projects.models import Project, Task
+
+DEFAULT_PERFORMANCE_SCORE = 85
+
+
+def calculate_performance_score(total, completed, on_time):
+    if not total:
+        return DEFAULT_PERFORMANCE_SCORE
+    return int((completed / total) * 40 + (on_time / max(completed, 1)) * 60)
+
+
+def percentage(part, total):
+    if not total:
+        return 0
+    return (part / total) * 100
+
+
+def task_metrics_aggregates():
+    """
+    Conditional aggregates shared by the dashboard and anything else that scores employees
+    (keys are relative to the Task model).
+    """
+    week_start = timezone.now() - timedelta(days=7)
+    completed = Q(status='completed')
+    weekly = Q(created_at__gte=week_start)
+
+    return {
+        'total': Count('id'),
+        'completed': Count('id', filter=completed),
+        'on_time': Count('id', filter=completed & Q(completed_at__lte=F('due_date'))),
+        'weekly_total': Count('id', filter=weekly),
+        'weekly_completed': Count('id', filter=weekly & completed),
+    }
+
+
+def calculate_task_metrics(employee):
+    """All task counters of the employee in a single aggregate query"""
+    return Task.objects.filter(assigned_to=employee).aggregate(**task_metrics_aggregates())
+
+
+def calculate_project_metrics(employee):
+    """Supervised projects with their team size in a single annotated query"""
+    projects = list(
+        employee.supervised_projects.annotate(
+            # the supervisors join is already narrowed to this employee, count the team separately
+            team_size=Coalesce(Subquery(
+                Project.supervisors.through.objects.filter(project=OuterRef('pk'))
+                .values('project')
+                .annotate(count=Count('*'))
+                .values('count')
+            ), 0),
+        )
+    )
+
+    return {
+        'total': len(projects),
+        'active': [project for project in projects if project.status == 'ongoing'],
+        'completed_tasks': sum(project.completed_tasks_count for project in projects),
+        'total_tasks': sum(project.tasks_count for project in projects),
+    }
+
+
+def calculate_dashboard_metrics(employee):
+    tasks = calculate_task_metrics(employee)
+    projects = calculate_project_metrics(employee)
+
+    return {
+        'tasks': tasks,
+        'projects': projects,
+        'performance_score': calculate_performance_score(tasks['total'], tasks['completed'], tasks['on_time']),
+        'completion_rate': round(percentage(tasks['completed'], tasks['total'])),
+        'weekly_performance': int(percentage(tasks['weekly_completed'], tasks['weekly_total'])),
+    }
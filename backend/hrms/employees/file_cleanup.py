@@ -0,0 +1,64 @@
+import logging
+import threading
+
+from django.core.files.storage import default_storage
+from django.db import transaction, connection
+
+from .models import PendingFileDeletion
+from .thumbnails import thumbnail_names, forget_thumbnails
+
+logger = logging.getLogger(__name__)
+
+_sweeper_lock = threading.Lock()
+
+
+def queue_file_deletion(files):
+    """
+    Record the files in the current transaction and remove them after it commits,
+    a rolled back delete keeps both its rows and its files.
+    """
+    names = [getattr(file, 'name', file) for file in files]
+    names = [name for name in names if name]
+    if not names:
+        return
+
+    # derivatives live next to their originals and go with them
+    for name in list(names):
+        names.extend(thumbnail_names(name))
+        forget_thumbnails(name)
+
+    PendingFileDeletion.objects.bulk_create([PendingFileDeletion(name=name) for name in names])
+    transaction.on_commit(start_sweeper)
+
+
+def sweep_pending_files(batch_size=500):
+    deleted = 0
+    with _sweeper_lock:
+        while pending := list(PendingFileDeletion.objects.order_by('id')[:batch_size]):
+            done = []
+            for file in pending:
+                try:
+                    default_storage.delete(file.name)
+                    done.append(file.id)
+                except OSError:
+                    logger.exception("Could not delete %s", file.name)
+            PendingFileDeletion.objects.filter(id__in=done).delete()
+            deleted += len(done)
+            if len(done) < len(pending):
+                # leave the failing files for the next run
+                break
+    return deleted
+
+
+def _run_sweeper():
+    try:
+        sweep_pending_files()
+    except Exception:
+        logger.exception("File sweeper failed")
+    finally:
+        # the thread owns its connection
+        connection.close()
+
+
+def start_sweeper():
+    threading.Thread(target=_run_sweeper, name="file-sweeper", daemon=True).start()
@@ -0,0 +1,220 @@
+import csv
+import io
+from itertools import islice
+from pathlib import Path
+from xml.etree.ElementTree import ParseError
+from zipfile import BadZipFile
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+from hrms.utils import calculate_age
+from .models import Employee, Department, PerformanceScore
+from .search import employee_search
+
+UNIQUE_FIELDS = ['email', 'phone', 'employee_id', 'national_id']
+
+
+class ImportFileError(Exception):
+    pass
+
+
+class EmployeeImportSerializer(serializers.ModelSerializer):
+    """Row validation without database access, uniqueness is checked per batch by EmployeeImporter"""
+    department = serializers.CharField()
+
+    class Meta:
+        model = Employee
+        fields = ['name', 'department', 'gender', 'email', 'phone', 'employee_id', 'address', 'birth_date',
+                  'national_id', 'marital_status', 'position', 'hire_date', 'mode', 'is_active']
+        extra_kwargs = {field: {'validators': []} for field in UNIQUE_FIELDS}
+
+    def validate_department(self, value):
+        departments = self.context['departments']
+        department_id = departments.get(value.strip())
+        if department_id is None:
+            raise serializers.ValidationError(_("القسم غير موجود."))
+        return department_id
+
+
+def clean_row(keys, values):
+    # empty cells are left out so optional fields fall back to their defaults
+    row = {}
+    for key, value in zip(keys, values):
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()[:10]
+        value = str(value).strip() if value is not None else ''
+        if key and value:
+            row[key] = value
+    return row
+
+
+def read_csv(file):
+    reader = csv.reader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+    try:
+        header = [key.strip() for key in next(reader, [])]
+        for values in reader:
+            row = clean_row(header, values)
+            if row:
+                yield reader.line_num, row
+    except UnicodeDecodeError:
+        raise ImportFileError(_("يجب أن يكون ملف CSV بترميز UTF-8."))
+    except csv.Error:
+        raise ImportFileError(_("تعذرت قراءة ملف CSV."))
+
+
+def read_xlsx(file):
+    try:
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+    except ImportError:
+        raise ImportFileError(_("قراءة ملفات Excel تتطلب تثبيت openpyxl."))
+
+    # a damaged workbook fails on open or on any later row
+    unreadable = (BadZipFile, InvalidFileException, KeyError, OSError, ValueError, ParseError)
+    try:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except unreadable:
+        raise ImportFileError(_("تعذرت قراءة ملف Excel."))
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else '' for cell in next(rows, [])]
+        for row_number, values in enumerate(rows, start=2):
+            row = clean_row(header, values)
+            if row:
+                yield row_number, row
+    except unreadable:
+        raise ImportFileError(_("تعذرت قراءة ملف Excel."))
+    finally:
+        workbook.close()
+
+
+def read_rows(file, filename):
+    extension = Path(filename).suffix.lower()
+    if extension == '.csv':
+        return read_csv(file)
+    if extension in ('.xlsx', '.xlsm'):
+        return read_xlsx(file)
+    raise ImportFileError(_("صيغة الملف غير مدعومة، استخدم CSV أو XLSX."))
+
+
+class EmployeeImporter:
+    """
+    Validates employee rows in batches and inserts them with bulk_create.
+
+    Duplicated unique values are detected against the previous rows of the file with in-memory sets
+    and against the database with one IN lookup per batch.
+    """
+
+    def __init__(self, created_by, batch_size=500, dry_run=False):
+        self.created_by = created_by
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.departments = {}
+        for department_id, name in Department.objects.values_list('id', 'name'):
+            self.departments[str(department_id)] = department_id
+            self.departments[name.strip()] = department_id
+        # a single instance validates every row, like the child of a list serializer
+        self.validator = EmployeeImportSerializer(context={'departments': self.departments})
+        self.seen = {field: set() for field in UNIQUE_FIELDS}
+        self.total = 0
+        self.created = 0
+        self.errors = []
+
+    def run(self, rows):
+        """rows is an iterable of (row number, row dict)"""
+        rows = iter(rows)
+        with transaction.atomic():
+            while batch := list(islice(rows, self.batch_size)):
+                self.import_batch(batch)
+            if self.dry_run:
+                transaction.set_rollback(True)
+        return self.report()
+
+    def report(self):
+        return {
+            'total': self.total,
+            'created': 0 if self.dry_run else self.created,
+            'valid': self.created,
+            'errors': self.errors,
+        }
+
+    def unique_error(self, field):
+        return [Employee._meta.get_field(field).error_messages['unique']]
+
+    def import_batch(self, batch):
+        self.total += len(batch)
+        candidates = []
+
+        for row_number, row in batch:
+            try:
+                data = self.validator.run_validation(row)
+            except serializers.ValidationError as e:
+                self.errors.append({'row': row_number, 'errors': e.detail})
+                continue
+
+            duplicates = {field: self.unique_error(field) for field in UNIQUE_FIELDS if data[field] in self.seen[field]}
+            if duplicates:
+                self.errors.append({'row': row_number, 'errors': duplicates})
+                continue
+
+            for field in UNIQUE_FIELDS:
+                self.seen[field].add(data[field])
+            candidates.append((row_number, data))
+
+        existing = self.find_existing(data for row_number, data in candidates)
+
+        employees = []
+        for row_number, data in candidates:
+            duplicates = {field: self.unique_error(field) for field in UNIQUE_FIELDS if data[field] in existing[field]}
+            if duplicates:
+                self.errors.append({'row': row_number, 'errors': duplicates})
+                continue
+            employees.append(self.build_employee(data))
+
+        if employees:
+            Employee.objects.bulk_create(employees)
+            self.create_related(employees)
+            self.created += len(employees)
+
+    def find_existing(self, rows):
+        values = {field: set() for field in UNIQUE_FIELDS}
+        for data in rows:
+            for field in UNIQUE_FIELDS:
+                values[field].add(data[field])
+
+        existing = {field: set() for field in UNIQUE_FIELDS}
+        if not values['employee_id']:
+            return existing
+
+        condition = Q()
+        for field in UNIQUE_FIELDS:
+            condition |= Q(**{f"{field}__in": values[field]})
+        for row in Employee.objects.filter(condition).values_list(*UNIQUE_FIELDS):
+            for field, value in zip(UNIQUE_FIELDS, row):
+                existing[field].add(value)
+        return existing
+
+    def build_employee(self, data):
+        data = dict(data)
+        department_id = data.pop('department')
+        birth_date = data.get('birth_date')
+        return Employee(
+            **data,
+            department_id=department_id,
+            age=calculate_age(birth_date) if birth_date else None,
+            created_by=self.created_by,
+        )
+
+    def create_related(self, employees):
+        # bulk_create skips the post_save signals
+        created = list(Employee.objects.filter(
+            employee_id__in=[employee.employee_id for employee in employees]
+        ).only('pk', *employee_search.fields))
+        PerformanceScore.objects.bulk_create(
+            [PerformanceScore(employee_id=employee.pk) for employee in created],
+            ignore_conflicts=True,
+        )
+        employee_search.index(created)
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.importer import EmployeeImporter, ImportFileError, read_rows
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Import employees from a CSV or XLSX file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--created-by', required=True, help="username of the user recorded as creator")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help="validate the file without saving")
+
+    def handle(self, *args, **options):
+        try:
+            created_by = User.objects.get(username=options['created_by'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['created_by']} does not exist")
+
+        importer = EmployeeImporter(created_by, batch_size=options['batch_size'], dry_run=options['dry_run'])
+        try:
+            with open(options['path'], 'rb') as file:
+                report = importer.run(read_rows(file, options['path']))
+        except (OSError, ImportFileError) as e:
+            raise CommandError(str(e))
+
+        for error in report['errors']:
+            messages = "; ".join(f"{field}: {' '.join(map(str, errors))}" for field, errors in error['errors'].items())
+            self.stderr.write(f"row {error['row']}: {messages}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['total']} rows, {report['valid']} valid, {report['created']} created, "
+            f"{len(report['errors'])} errors"
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from employees.models import Employee
+from employees.search import employee_search
+from users.models import User
+from users.search import user_search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search tables of employees and users"
+
+    def handle(self, *args, **options):
+        for index, queryset in ((employee_search, Employee.objects.all()), (user_search, User.objects.all())):
+            index.create(queryset.db)
+            total = index.rebuild(queryset)
+            self.stdout.write(self.style.SUCCESS(f"Indexed {total} rows in {index.table}"))
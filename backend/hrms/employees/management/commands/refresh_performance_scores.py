@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from employees.models import Employee
+from employees.performance import refresh_performance_scores
+
+
+class Command(BaseCommand):
+    help = "Rebuild the persisted performance scores of all employees"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        employee_ids = list(Employee.objects.values_list('id', flat=True))
+
+        for start in range(0, len(employee_ids), batch_size):
+            refresh_performance_scores(employee_ids[start:start + batch_size])
+
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {len(employee_ids)} performance scores"))
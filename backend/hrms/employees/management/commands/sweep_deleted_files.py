@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from employees.file_cleanup import sweep_pending_files
+
+
+class Command(BaseCommand):
+    help = "Remove media files queued for deletion that were not cleaned up yet"
+
+    def handle(self, *args, **options):
+        deleted = sweep_pending_files()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} files"))
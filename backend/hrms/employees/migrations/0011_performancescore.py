@@ -0,0 +1,65 @@
+# Generated by Django 5.2 on 2026-10-18 18:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Q
+
+
+def populate_performance_scores(apps, schema_editor):
+    Employee = apps.get_model('employees', 'Employee')
+    PerformanceScore = apps.get_model('employees', 'PerformanceScore')
+    Task = apps.get_model('projects', 'Task')
+
+    completed = Q(status='completed')
+    counters = {
+        row['assigned_to']: row
+        for row in Task.objects.values('assigned_to').annotate(
+            total=Count('id'),
+            completed=Count('id', filter=completed),
+            on_time=Count('id', filter=completed & Q(completed_at__lte=F('due_date'))),
+        )
+    }
+
+    scores = []
+    for employee_id in Employee.objects.values_list('id', flat=True):
+        row = counters.get(employee_id)
+        if row is None or not row['total']:
+            scores.append(PerformanceScore(employee_id=employee_id))
+            continue
+        score = int((row['completed'] / row['total']) * 40 + (row['on_time'] / max(row['completed'], 1)) * 60)
+        scores.append(PerformanceScore(
+            employee_id=employee_id,
+            score=score,
+            total_tasks=row['total'],
+            completed_tasks=row['completed'],
+            on_time_tasks=row['on_time'],
+        ))
+    PerformanceScore.objects.bulk_create(scores, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0010_alter_employee_department'),
+        ('projects', '0017_task_completed_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PerformanceScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveIntegerField(db_index=True, default=85, verbose_name='درجة الأداء')),
+                ('total_tasks', models.PositiveIntegerField(default=0, verbose_name='إجمالي المهام')),
+                ('completed_tasks', models.PositiveIntegerField(default=0, verbose_name='المهام المكتملة')),
+                ('on_time_tasks', models.PositiveIntegerField(default=0, verbose_name='المهام المكتملة في موعدها')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='آخر تحديث')),
+                ('employee', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='performance', to='employees.employee', verbose_name='الموظف')),
+            ],
+            options={
+                'verbose_name': 'درجة أداء',
+                'verbose_name_plural': 'درجات الأداء',
+            },
+        ),
+        migrations.RunPython(populate_performance_scores, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from hrms.utils import calculate_age
 from users.models import User
 from django.utils.translation import gettext_lazy as _
@@ -121,8 +121,49 @@ class Employee(models.Model):
         super().save(*args, **kwargs)
 
     def delete(self, using=None, keep_parents=False):
-        if self.cv:
-            self.cv.delete()
-        if self.image:
-            self.image.delete()
-        return super().delete()
+        from .file_cleanup import queue_file_deletion
+
+        # files are removed by the sweeper once the row delete is committed
+        with transaction.atomic():
+            queue_file_deletion([self.cv, self.image])
+            return super().delete()
+
+
+class PerformanceScore(models.Model):
+    employee = models.OneToOneField(
+        "Employee",
+        on_delete=models.CASCADE,
+        related_name="performance",
+        verbose_name=_("الموظف")
+    )
+
+    score = models.PositiveIntegerField(default=85, db_index=True, verbose_name=_("درجة الأداء"))
+
+    total_tasks = models.PositiveIntegerField(default=0, verbose_name=_("إجمالي المهام"))
+
+    completed_tasks = models.PositiveIntegerField(default=0, verbose_name=_("المهام المكتملة"))
+
+    on_time_tasks = models.PositiveIntegerField(default=0, verbose_name=_("المهام المكتملة في موعدها"))
+
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("آخر تحديث"))
+
+    class Meta:
+        verbose_name = _("درجة أداء")
+        verbose_name_plural = _("درجات الأداء")
+
+    def __str__(self):
+        return f"{self.employee} - {self.score}"
+
+
+class PendingFileDeletion(models.Model):
+    """Media files waiting to be removed from the storage after their rows were deleted"""
+    name = models.CharField(max_length=255, verbose_name=_("اسم الملف"))
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("تاريخ الإنشاء"))
+
+    class Meta:
+        verbose_name = _("ملف بانتظار الحذف")
+        verbose_name_plural = _("ملفات بانتظار الحذف")
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,71 @@
+from django.db.models import F, Func, OuterRef, Subquery, Window
+from django.db.models.functions import Rank
+
+from projects.models import Task
+from .dashboard import task_metrics_aggregates, calculate_performance_score
+from .models import PerformanceScore
+
+SCORE_FIELDS = ['score', 'total_tasks', 'completed_tasks', 'on_time_tasks', 'updated_at']
+
+
+def refresh_performance_scores(employee_ids):
+    """
+    Recompute the persisted scores of the given employees
+    with one grouped aggregate and one upsert.
+    """
+    employee_ids = set(employee_ids)
+    if not employee_ids:
+        return
+
+    aggregates = task_metrics_aggregates()
+    counters = {
+        row['assigned_to']: row
+        for row in Task.objects.filter(assigned_to__in=employee_ids)
+        .values('assigned_to')
+        .annotate(total=aggregates['total'], completed=aggregates['completed'], on_time=aggregates['on_time'])
+    }
+
+    scores = []
+    for employee_id in employee_ids:
+        row = counters.get(employee_id, {'total': 0, 'completed': 0, 'on_time': 0})
+        scores.append(PerformanceScore(
+            employee_id=employee_id,
+            score=calculate_performance_score(row['total'], row['completed'], row['on_time']),
+            total_tasks=row['total'],
+            completed_tasks=row['completed'],
+            on_time_tasks=row['on_time'],
+        ))
+
+    PerformanceScore.objects.bulk_create(
+        scores,
+        update_conflicts=True,
+        unique_fields=['employee'],
+        update_fields=SCORE_FIELDS,
+    )
+
+
+def department_ranking(department_id):
+    return (
+        PerformanceScore.objects
+        .filter(employee__department_id=department_id)
+        .annotate(rank=Window(Rank(), order_by=F('score').desc()))
+        .select_related('employee')
+        .order_by('rank', 'employee_id')
+    )
+
+
+def get_department_rank(employee):
+    """Rank of the employee's score in their department (same as department_ranking), None without a score"""
+    higher = (
+        PerformanceScore.objects
+        .filter(employee__department_id=employee.department_id, score__gt=OuterRef('score'))
+        .order_by()
+        .annotate(count=Func(F('pk'), function='COUNT'))
+        .values('count')
+    )
+    return (
+        PerformanceScore.objects.filter(employee=employee)
+        .annotate(rank=Subquery(higher) + 1)
+        .values_list('rank', flat=True)
+        .first()
+    )
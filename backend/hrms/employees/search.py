@@ -0,0 +1,8 @@
+from hrms.search import SearchIndex
+
+employee_search = SearchIndex(
+    'employees_employee_search',
+    fields=['name', 'employee_id', 'national_id', 'phone'],
+    weights=[10.0, 5.0, 2.0, 2.0],
+    substring_fields=['employee_id', 'national_id', 'phone'],
+)
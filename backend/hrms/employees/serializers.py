@@ -1,12 +1,14 @@
-from django.db.models import F
 from rest_framework import serializers
 from users.serializers import UserSerializer
-from .models import Department, Employee
+from .models import Department, Employee, PerformanceScore
 from hrms.utils import calculate_age
 from django.conf import settings
-from django.utils import timezone
-from datetime import timedelta, datetime
-from projects.models import Task
+from django.db import transaction
+from datetime import datetime
+from .dashboard import calculate_dashboard_metrics, percentage
+from .performance import get_department_rank
+from .file_cleanup import queue_file_deletion
+from .thumbnails import generate_thumbnails, get_thumbnail_url
 
 
 class DepartmentSerializer(serializers.ModelSerializer):
@@ -17,6 +19,9 @@ class DepartmentSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
     def get_employee_count(self, obj: Department):
+        # annotated by the querysets that list departments
+        if hasattr(obj, 'employee_count'):
+            return obj.employee_count
         return obj.employee_set.count()
 
 
@@ -31,6 +36,7 @@ class EmployeeReadSerializer(serializers.ModelSerializer):
     tenure = serializers.SerializerMethodField()
     completion_rate = serializers.SerializerMethodField()
     user = UserSerializer(read_only=True)
+    thumbnail = serializers.SerializerMethodField()
 
     class Meta:
         model = Employee
@@ -44,6 +50,9 @@ class EmployeeReadSerializer(serializers.ModelSerializer):
             return (datetime.now(settings.CAIRO_TZ).date() - obj.hire_date).days
         return 0
 
+    def get_thumbnail(self, obj: Employee):
+        return get_thumbnail_url(obj.image, 'medium', self.context.get('request'))
+
     def get_completion_rate(self, obj: Employee):
         tasks = obj.tasks.all()
         total = obj.tasks.count()
@@ -59,14 +68,37 @@ class EmployeeListSerializer(serializers.ModelSerializer):
     department = serializers.StringRelatedField(read_only=True)
     assignments = serializers.SerializerMethodField()
     url = serializers.HyperlinkedIdentityField(view_name='employee-detail')
+    thumbnail = serializers.SerializerMethodField()
 
     class Meta:
         model = Employee
-        fields = ['id', 'url', 'name', 'position', 'employee_id', 'assignments', 'image', 'department', 'is_active']
+        fields = ['id', 'url', 'name', 'position', 'employee_id', 'assignments', 'image', 'thumbnail', 'department',
+                  'is_active']
 
     def get_assignments(self, obj):
         return 5
 
+    def get_thumbnail(self, obj):
+        return get_thumbnail_url(obj.image, 'small', self.context.get('request'))
+
+
+class PerformanceScoreSerializer(serializers.ModelSerializer):
+    rank = serializers.IntegerField(read_only=True)
+    id = serializers.IntegerField(read_only=True, source='employee.id')
+    name = serializers.CharField(read_only=True, source='employee.name')
+    employee_id = serializers.CharField(read_only=True, source='employee.employee_id')
+    position = serializers.CharField(read_only=True, source='employee.position')
+    image = serializers.ImageField(read_only=True, source='employee.image')
+    thumbnail = serializers.SerializerMethodField()
+
+    class Meta:
+        model = PerformanceScore
+        fields = ['rank', 'id', 'name', 'employee_id', 'position', 'image', 'thumbnail', 'score', 'total_tasks',
+                  'completed_tasks', 'on_time_tasks']
+
+    def get_thumbnail(self, obj):
+        return get_thumbnail_url(obj.employee.image, 'small', self.context.get('request'))
+
 
 class EmployeeWriteSerializer(serializers.ModelSerializer):
     class Meta:
@@ -75,7 +107,10 @@ class EmployeeWriteSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         auth_user = self.context['request'].user
-        return Employee.objects.create(**validated_data, created_by=auth_user)
+        employee = Employee.objects.create(**validated_data, created_by=auth_user)
+        if employee.image:
+            generate_thumbnails(employee.image.name)
+        return employee
 
     def update(self, instance: Employee, validated_data):
         cv = validated_data.pop('cv', None)
@@ -85,19 +120,24 @@ class EmployeeWriteSerializer(serializers.ModelSerializer):
         if birth_date:
             instance.age = calculate_age(birth_date)
 
-        instance = super().update(instance, validated_data)
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
 
-        if cv:
-            if instance.cv:
-                instance.cv.delete(save=False)
-            instance.cv = cv
+            # the replaced files are removed after the new ones are committed
+            if cv:
+                if instance.cv:
+                    queue_file_deletion([instance.cv])
+                instance.cv = cv
 
-        if image:
-            if instance.image:
-                instance.image.delete(save=False)
-            instance.image = image
+            if image:
+                if instance.image:
+                    queue_file_deletion([instance.image])
+                instance.image = image
+
+            instance.save()
 
-        instance.save()
+        if image:
+            generate_thumbnails(instance.image.name)
         return instance
 
 
@@ -121,14 +161,20 @@ class EmployeeDashboardSerializer(serializers.ModelSerializer):
             'rank', 'notifications', 'unread_messages',
         ]
 
+    def get_metrics(self, obj):
+        """Dashboard counters are aggregated once per employee and shared by every field"""
+        cache = self.context.setdefault('dashboard_metrics', {})
+        if obj.pk not in cache:
+            cache[obj.pk] = calculate_dashboard_metrics(obj)
+        return cache[obj.pk]
+
     # ---------------------------
     # Tasks
     # ---------------------------
     def get_tasks(self, obj):
         today = datetime.now(settings.CAIRO_TZ).date()
-        tasks_qs = obj.tasks.all().order_by('due_date', 'priority')
-        total = tasks_qs.count()
-        completed = tasks_qs.filter(status='completed').count()
+        metrics = self.get_metrics(obj)['tasks']
+        tasks_qs = obj.tasks.select_related('project').order_by('due_date', 'priority')
 
         today_focus = []
         upcoming = []
@@ -150,8 +196,8 @@ class EmployeeDashboardSerializer(serializers.ModelSerializer):
                 upcoming.append(task_data)
 
         return {
-            "total": total,
-            "completed": completed,
+            "total": metrics['total'],
+            "completed": metrics['completed'],
             "today_focus": today_focus,
             "upcoming": upcoming,
         }
@@ -160,32 +206,25 @@ class EmployeeDashboardSerializer(serializers.ModelSerializer):
     # Projects
     # ---------------------------
     def get_projects(self, obj):
-        projects_qs = obj.supervised_projects.all()
-        total = projects_qs.count()
-        active_qs = projects_qs.filter(status='ongoing')
-        active = active_qs.count()
-        completed_tasks = Task.objects.filter(project__in=projects_qs, status='completed').count()
-        total_tasks = Task.objects.filter(project__in=projects_qs).count()
+        metrics = self.get_metrics(obj)['projects']
+        total_tasks = metrics['total_tasks']
 
         active_projects = []
-        for project in active_qs:
+        for project in metrics['active']:
             active_projects.append({
                 "id": project.id,
                 "name": project.name,
                 "description": project.description or None,
                 "status": project.get_status_display(),
-                "progress": int(
-                    ((total_tasks > 0 and Task.objects.filter(project=project, status='completed').count()) /
-                     total_tasks) * 100 if total_tasks else 0
-                ),
+                "progress": int(percentage(project.completed_tasks_count, total_tasks)),
                 "end_date": project.end_date.isoformat() if project.end_date else None,
-                "team_size": project.supervisors.count(),
+                "team_size": project.team_size,
             })
 
         return {
-            "total": total,
-            "active": active,
-            "completed_tasks": completed_tasks,
+            "total": metrics['total'],
+            "active": len(metrics['active']),
+            "completed_tasks": metrics['completed_tasks'],
             "total_tasks": total_tasks,
             "active_projects": active_projects,
         }
@@ -194,51 +233,22 @@ class EmployeeDashboardSerializer(serializers.ModelSerializer):
     # Performance
     # ---------------------------
     def get_performance_score(self, obj):
-        tasks_qs = obj.tasks.all()
-        if not tasks_qs.exists():
-            return 85
-        completed = tasks_qs.filter(status='completed').count()
-        on_time = tasks_qs.filter(
-            status='completed',
-            completed_at__lte=F('due_date')
-        ).count()
-        return int((completed / tasks_qs.count()) * 40 + (on_time / max(completed, 1)) * 60)
+        return self.get_metrics(obj)['performance_score']
 
     def get_completionRate(self, obj):
-        tasks_qs = obj.tasks.all()
-        total = tasks_qs.count()
-        completed = tasks_qs.filter(status='completed').count()
-        if total == 0:
-            return 0
-        return round((completed / total) * 100)
+        return self.get_metrics(obj)['completion_rate']
 
     def get_weekly_performance(self, obj):
-        week_start = timezone.now() - timedelta(days=7)
-        tasks_qs = obj.tasks.filter(created_at__gte=week_start)
-        total = tasks_qs.count()
-        completed = tasks_qs.filter(status='completed').count()
-        if total == 0:
-            return 0
-        return int((completed / total) * 100)
+        return self.get_metrics(obj)['weekly_performance']
 
     def get_weekly_completed_tasks(self, obj):
-        week_start = timezone.now() - timedelta(days=7)
-        return obj.tasks.filter(created_at__gte=week_start, status='completed').count()
+        return self.get_metrics(obj)['tasks']['weekly_completed']
 
     # ---------------------------
     # Rank
     # ---------------------------
     def get_rank(self, obj):
-        dept_employees = Employee.objects.filter(department=obj.department)
-        scores = []
-        for emp in dept_employees:
-            score = self.get_performance_score(emp)
-            scores.append((emp.id, score))
-        scores.sort(key=lambda x: x[1], reverse=True)
-        for i, (emp_id, _) in enumerate(scores):
-            if emp_id == obj.id:
-                return i + 1
-        return None
+        return get_department_rank(obj)
 
     # ---------------------------
     # Notifications
@@ -0,0 +1,60 @@
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from projects.models import Task
+from .models import Employee, PerformanceScore
+from .performance import refresh_performance_scores
+from .search import employee_search
+
+
+@receiver(post_save, sender=Employee)
+def create_performance_score(sender, instance, created, **kwargs):
+    if created:
+        PerformanceScore.objects.get_or_create(employee=instance)
+
+
+@receiver(post_save, sender=Employee)
+def index_employee(sender, instance, update_fields, using, **kwargs):
+    if update_fields is None or set(update_fields) & set(employee_search.fields):
+        employee_search.index([instance], using)
+
+
+@receiver(post_delete, sender=Employee)
+def unindex_employee(sender, instance, using, **kwargs):
+    employee_search.remove([instance.pk], using)
+
+
+@receiver(post_save, sender=Task)
+def refresh_assignees_scores(sender, instance, created, **kwargs):
+    # new tasks have no assignees yet, they are handled by the m2m signal
+    if not created:
+        refresh_performance_scores(instance.assigned_to.values_list('id', flat=True))
+
+
+@receiver(m2m_changed, sender=Task.assigned_to.through)
+def refresh_reassigned_scores(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and not reverse:
+        # pk_set is not provided on clear, remember who was assigned
+        instance._cleared_task_assignees = set(instance.assigned_to.values_list('id', flat=True))
+        return
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if reverse:
+        # instance is the employee
+        refresh_performance_scores({instance.pk})
+    elif action == 'post_clear':
+        refresh_performance_scores(getattr(instance, '_cleared_task_assignees', set()))
+    else:
+        refresh_performance_scores(pk_set)
+
+
+@receiver(pre_delete, sender=Task)
+def remember_task_assignees(sender, instance, **kwargs):
+    instance._deleted_task_assignees = set(instance.assigned_to.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Task)
+def refresh_deleted_task_scores(sender, instance, **kwargs):
+    refresh_performance_scores(getattr(instance, '_deleted_task_assignees', set()))
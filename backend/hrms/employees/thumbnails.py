@@ -0,0 +1,80 @@
+import logging
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+logger = logging.getLogger(__name__)
+
+# square avatars, in pixels
+THUMBNAIL_SIZES = {
+    'small': 64,
+    'medium': 256,
+}
+THUMBNAIL_FORMAT = 'WEBP'
+THUMBNAIL_QUALITY = 80
+
+# thumbnails known to exist on disk, saves a storage lookup per serialized row
+_known_thumbnails = set()
+
+
+def thumbnail_name(name, size):
+    path = PurePosixPath(name)
+    extension = path.suffix.lstrip('.')
+    return str(path.parent / 'thumbnails' / f"{path.stem}_{extension}_{size}.webp")
+
+
+def thumbnail_names(name):
+    if not name or PurePosixPath(name).suffix.lower() not in Image.registered_extensions():
+        return []
+    return [thumbnail_name(name, size) for size in THUMBNAIL_SIZES]
+
+
+def generate_thumbnails(name):
+    """Render every thumbnail size of the stored image, returns False if it can not be read"""
+    try:
+        with default_storage.open(name) as file:
+            original = ImageOps.exif_transpose(Image.open(file))
+            original = original.convert('RGBA' if original.mode in ('RGBA', 'LA', 'P') else 'RGB')
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        logger.warning("Could not generate thumbnails of %s", name)
+        return False
+
+    for size, pixels in THUMBNAIL_SIZES.items():
+        thumbnail = ImageOps.fit(original, (pixels, pixels), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        thumbnail.save(buffer, THUMBNAIL_FORMAT, quality=THUMBNAIL_QUALITY)
+
+        target = thumbnail_name(name, size)
+        if default_storage.exists(target):
+            default_storage.delete(target)
+        default_storage.save(target, ContentFile(buffer.getvalue()))
+        _known_thumbnails.add(target)
+
+    return True
+
+
+def get_thumbnail_url(image, size='small', request=None):
+    """
+    URL of the thumbnail of an ImageField file, generated on first use.
+    Falls back to the original image if it can not be processed.
+    """
+    if not image:
+        return None
+
+    target = thumbnail_name(image.name, size)
+    if target not in _known_thumbnails:
+        if default_storage.exists(target) or generate_thumbnails(image.name):
+            _known_thumbnails.add(target)
+        else:
+            target = image.name
+
+    url = default_storage.url(target)
+    return request.build_absolute_uri(url) if request else url
+
+
+def forget_thumbnails(name):
+    for target in thumbnail_names(name):
+        _known_thumbnails.discard(target)
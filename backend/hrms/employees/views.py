@@ -3,21 +3,28 @@ from rest_framework.response import Response
 from rest_framework import viewsets, status
 from rest_framework.views import APIView
 
+from hrms.rest_framework_utils.streaming import StreamingListMixin
 from users.models import User
 from users.serializers import UserSerializer
 from .serializers import DepartmentSerializer, EmployeeReadSerializer, EmployeeWriteSerializer, EmployeeListSerializer, \
-    EmployeeDashboardSerializer
+    EmployeeDashboardSerializer, PerformanceScoreSerializer
 from .models import Department, Employee
+from .performance import department_ranking
+from .importer import EmployeeImporter, ImportFileError, read_rows
+from .file_cleanup import queue_file_deletion
+from .search import employee_search
 from rest_framework.decorators import action, api_view
-from django.db.models import Q
+from rest_framework.parsers import MultiPartParser
+from django.db import transaction
+from django.db.models import Q, Count, ProtectedError, RestrictedError
 from django.utils.translation import gettext_lazy as _
 
 
-class DepartmentViewSet(viewsets.ModelViewSet):
+class DepartmentViewSet(StreamingListMixin, viewsets.ModelViewSet):
     serializer_class = DepartmentSerializer
 
     def get_queryset(self):
-        queryset = Department.objects.all()
+        queryset = Department.objects.annotate(employee_count=Count('employee'))
         search = self.request.query_params.get('search', None)
 
         if search:
@@ -25,8 +32,18 @@ class DepartmentViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    @action(detail=True, methods=['get'])
+    def leaderboard(self, request, pk=None):
+        queryset = department_ranking(pk)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = PerformanceScoreSerializer(page, many=True, context={"request": request})
+            return self.get_paginated_response(serializer.data)
+        serializer = PerformanceScoreSerializer(queryset, many=True, context={"request": request})
+        return Response(serializer.data)
+
 
-class EmployeeViewSet(viewsets.ModelViewSet):
+class EmployeeViewSet(StreamingListMixin, viewsets.ModelViewSet):
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -35,17 +52,17 @@ class EmployeeViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         search = self.request.query_params.get('search', None)
-        queryset = Employee.objects.all()
+        queryset = Employee.objects.select_related('department')
 
         if search:
-            queryset = queryset.filter(Q(name__icontains=search) | Q(employee_id__icontains=search))
+            queryset = employee_search.filter(queryset, search)
 
         return queryset
 
     @action(detail=True, methods=['get'])
     def detailed(self, request, pk=None):
         try:
-            employee = Employee.objects.get(pk=pk)
+            employee = Employee.objects.select_related('department', 'created_by', 'user').get(pk=pk)
             data = EmployeeReadSerializer(employee, context={"request": self.request}).data
             return Response(data)
         except Employee.DoesNotExist:
@@ -79,7 +96,7 @@ class EmployeeViewSet(viewsets.ModelViewSet):
             employee = Employee.objects.get(id=pk)
 
             projects = employee.supervised_projects.all()
-            tasks = employee.tasks.all()
+            tasks = employee.tasks.select_related('project')
 
             data = {
                 "projects": [
@@ -168,6 +185,21 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         except Employee.DoesNotExist:
             return Response({'detail': _('موظف غير موجود')}, status=status.HTTP_404_NOT_FOUND)
 
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_employees(self, request):
+        file = request.FILES.get('file')
+        if file is None:
+            return Response({'file': [_('يرجى رفع ملف الموظفين')]}, status=status.HTTP_400_BAD_REQUEST)
+
+        dry_run = str(request.data.get('dry_run', '')).lower() == 'true'
+        try:
+            report = EmployeeImporter(created_by=request.user, dry_run=dry_run).run(read_rows(file, file.name))
+        except ImportFileError as e:
+            return Response({'file': [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
+
+        response_status = status.HTTP_201_CREATED if report['created'] else status.HTTP_200_OK
+        return Response(report, status=response_status)
+
     @action(detail=True, methods=['get'])
     def dashboard_data(self, request, pk=None):
         try:
@@ -234,8 +266,30 @@ class EmployeeDashboardView(APIView):
 
 @api_view(["DELETE"])
 def multiple_delete(request):
-    for emp_id in list(request.data):
-        emp = Employee.objects.filter(id=emp_id).first()
-        if emp:
-            emp.delete()
-    return Response()
+    requested = request.data
+    if not isinstance(requested, list):
+        return Response({"detail": _("يرجى إرسال قائمة بالمعرفات")}, status=status.HTTP_400_BAD_REQUEST)
+
+    # parsed id of every requested item by position, None for malformed ones
+    ids = []
+    for emp_id in requested:
+        try:
+            ids.append(int(emp_id) if isinstance(emp_id, (int, str)) else None)
+        except ValueError:
+            ids.append(None)
+
+    try:
+        with transaction.atomic():
+            employees = Employee.objects.filter(id__in=[pk for pk in ids if pk is not None])
+            files = {pk: (cv, image) for pk, cv, image in employees.values_list('id', 'cv', 'image')}
+            queue_file_deletion([name for pair in files.values() for name in pair])
+            employees.delete()
+    except (ProtectedError, RestrictedError) as e:
+        results = [{"id": emp_id, "status": "failed", "detail": str(e)} for emp_id in requested]
+        return Response({"results": results}, status=status.HTTP_409_CONFLICT)
+
+    results = [
+        {"id": emp_id, "status": "deleted" if pk in files else "not_found"}
+        for emp_id, pk in zip(requested, ids)
+    ]
+    return Response({"results": results})
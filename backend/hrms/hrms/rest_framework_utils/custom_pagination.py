@@ -1,18 +1,46 @@
+import base64
+import json
+from math import ceil
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class CustomPageNumberPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     page_size = 10
 
+    # "page" (default), "cursor" or "none", views may set a default with a `pagination_mode` attribute
+    pagination_mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    with_count_query_param = 'with_count'
+
+    # keyset ordering used in cursor mode, views override it with a `cursor_ordering` attribute;
+    # the last field has to be unique (usually the id) and none of them nullable
+    cursor_ordering = ('-id',)
+
+    mode = 'page'
+
     def paginate_queryset(self, queryset, request, view=None):
         no_pagination = request.query_params.get("no_pagination", None)
         if no_pagination and no_pagination.lower() == 'true':
             return None
+
+        self.mode = self.get_pagination_mode(request, view)
+        if self.mode == 'none':
+            return None
+        if self.mode == 'cursor':
+            return self.paginate_queryset_by_cursor(queryset, request, view)
         return super().paginate_queryset(queryset, request, view)
 
     def get_paginated_response(self, data):
+        if self.mode == 'cursor':
+            return self.get_cursor_paginated_response(data)
+
         total_pages = self.page.paginator.num_pages
         return Response({
             'total_pages': total_pages,
@@ -22,3 +50,106 @@ class CustomPageNumberPagination(PageNumberPagination):
             'previous': self.get_previous_link(),
             'data': data,
         })
+
+    def get_pagination_mode(self, request, view):
+        # function views that build their own paginator read the page state, they stay in page mode
+        if view is None:
+            return 'page'
+        mode = request.query_params.get(self.pagination_mode_query_param)
+        if mode in ('page', 'cursor', 'none'):
+            return mode
+        return getattr(view, 'pagination_mode', None) or 'page'
+
+    # ---------------------------
+    # Cursor (keyset) mode
+    # ---------------------------
+    def paginate_queryset_by_cursor(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = tuple(getattr(view, 'cursor_ordering', self.cursor_ordering))
+        self.queryset = queryset
+
+        position, reverse = self.decode_cursor(request)
+        ordering = self.ordering if not reverse else self.reverse_ordering(self.ordering)
+
+        try:
+            if position is not None:
+                queryset = queryset.filter(self.keyset_filter(ordering, position))
+            results = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        except (ValueError, TypeError, DjangoValidationError):
+            # a tampered cursor whose values don't fit the ordering fields
+            raise NotFound(self.invalid_page_message)
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.first_position = self.get_position(results[0]) if results else position
+        self.last_position = self.get_position(results[-1]) if results else position
+        return results
+
+    def get_cursor_paginated_response(self, data):
+        response = {
+            'next': self.get_cursor_link(self.last_position, reverse=False) if self.has_next else None,
+            'previous': self.get_cursor_link(self.first_position, reverse=True) if self.has_previous else None,
+            'data': data,
+        }
+
+        # counting the whole table is what cursor mode avoids, only do it on demand
+        with_count = self.request.query_params.get(self.with_count_query_param, '')
+        if with_count.lower() == 'true':
+            count = self.queryset.count()
+            response['count'] = count
+            response['total_pages'] = ceil(count / self.page_size) if count else 1
+
+        return Response(response)
+
+    def get_position(self, obj):
+        position = []
+        for field in self.ordering:
+            value = getattr(obj, field.lstrip('-'))
+            position.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return position
+
+    @staticmethod
+    def reverse_ordering(ordering):
+        return tuple(field[1:] if field.startswith('-') else f"-{field}" for field in ordering)
+
+    @staticmethod
+    def keyset_filter(ordering, position):
+        """Rows strictly after `position` in `ordering`: (a > x) or (a = x and b > y) ..."""
+        condition = Q()
+        equal = {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        return condition
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'p': position, 'r': reverse}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            position, reverse = payload['p'], bool(payload['r'])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_page_message)
+
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_page_message)
+        return position, reverse
+
+    def get_cursor_link(self, position, reverse):
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(position, reverse))
@@ -0,0 +1,65 @@
+from operator import attrgetter
+
+
+def sort_rows(rows, ordering):
+    """Sorts model instances by `ordering` ('-field' for descending), one stable pass per field"""
+    for field in reversed(ordering):
+        rows.sort(key=attrgetter(field.lstrip('-')), reverse=field.startswith('-'))
+    return rows
+
+
+class MergedQuerySet:
+    """
+    Read-only union of querysets of models sharing their field names (e.g. live and archived attendance),
+    listed as one sequence in `ordering`.
+
+    Supports what the list views and CustomPageNumberPagination use: filter, select_related, only, order_by,
+    count, iteration and slicing. A slice [a:b] reads the first b rows of every queryset and merges them,
+    the ordering fields have to be unique across the querysets for cursor pages.
+    """
+    ordered = True
+
+    def __init__(self, querysets, ordering):
+        self.querysets = list(querysets)
+        self.ordering = tuple(ordering)
+
+    def _apply(self, method, *args, **kwargs):
+        return MergedQuerySet([getattr(queryset, method)(*args, **kwargs) for queryset in self.querysets],
+                              self.ordering)
+
+    def filter(self, *args, **kwargs):
+        return self._apply('filter', *args, **kwargs)
+
+    def select_related(self, *fields):
+        return self._apply('select_related', *fields)
+
+    def only(self, *fields):
+        return self._apply('only', *fields)
+
+    def order_by(self, *ordering):
+        return MergedQuerySet(self.querysets, ordering)
+
+    def count(self):
+        return sum(queryset.count() for queryset in self.querysets)
+
+    def __len__(self):
+        return self.count()
+
+    def _read(self, limit=None):
+        rows = []
+        for queryset in self.querysets:
+            queryset = queryset.order_by(*self.ordering)
+            rows.extend(queryset[:limit] if limit is not None else queryset)
+        return sort_rows(rows, self.ordering)
+
+    def __iter__(self):
+        return iter(self._read())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if index.step is not None or (index.start or 0) < 0 or (index.stop or 0) < 0:
+                raise ValueError("Only forward slices are supported.")
+            return self._read(index.stop)[index]
+        if index < 0:
+            raise ValueError("Negative indexing is not supported.")
+        return self._read(index + 1)[index]
@@ -0,0 +1,102 @@
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils.translation import gettext_lazy as _
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger(__name__)
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+
+async def iterate_async(iterator):
+    """
+    Drives a sync iterator from the sync thread one item per hop. Under ASGI a sync iterator would be read
+    into a list before the first byte is sent.
+    """
+    done = object()
+    try:
+        while (item := await sync_to_async(next)(iterator, done)) is not done:
+            yield item
+    finally:
+        # a client that went away leaves the queryset iterator open otherwise
+        await sync_to_async(iterator.close)()
+
+
+class StreamingListMixin:
+    """
+    Streams unpaginated list responses (e.g. ?no_pagination=true) instead of building the whole list in memory.
+
+    The queryset is read with a chunked iterator and every chunk is serialized and written as soon as it is ready,
+    as a JSON array by default or as NDJSON when requested with ?stream_format=ndjson or the Accept header.
+
+    A failure half way ends NDJSON with an {"error": ...} line, a JSON array is left unterminated.
+    Under ASGI the chunks are handed over through an async iterator, so the response streams there as well.
+    """
+    stream_chunk_size = 500
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        return self.get_streaming_response(queryset)
+
+    def get_streaming_response(self, queryset):
+        if self.wants_ndjson():
+            content = self.stream_ndjson(queryset)
+            content_type = NDJSON_CONTENT_TYPE
+        else:
+            content = self.stream_json_array(queryset)
+            content_type = 'application/json'
+
+        if isinstance(self.request._request, ASGIRequest):
+            content = iterate_async(content)
+        return StreamingHttpResponse(content, content_type=content_type)
+
+    def wants_ndjson(self):
+        stream_format = self.request.query_params.get('stream_format', '')
+        return stream_format.lower() == 'ndjson' or NDJSON_CONTENT_TYPE in self.request.headers.get('Accept', '')
+
+    def iter_serialized(self, queryset):
+        """Serialized objects, one list per chunk"""
+        chunk = []
+        for obj in queryset.iterator(chunk_size=self.stream_chunk_size):
+            chunk.append(obj)
+            if len(chunk) == self.stream_chunk_size:
+                yield self.get_serializer(chunk, many=True).data
+                chunk = []
+        if chunk:
+            yield self.get_serializer(chunk, many=True).data
+
+    @staticmethod
+    def dumps(item):
+        # same output as the default JSONRenderer (unicode, compact)
+        return json.dumps(item, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def stream_json_array(self, queryset):
+        yield b'['
+        separator = b''
+        try:
+            for items in self.iter_serialized(queryset):
+                yield separator + b','.join(self.dumps(item) for item in items)
+                separator = b','
+        except Exception:
+            # no closing bracket, the body does not parse as a complete list
+            logger.exception("Streaming %s failed", self.request.path)
+            raise
+        yield b']'
+
+    def stream_ndjson(self, queryset):
+        try:
+            for items in self.iter_serialized(queryset):
+                yield b''.join(self.dumps(item) + b'\n' for item in items)
+        except Exception:
+            logger.exception("Streaming %s failed", self.request.path)
+            yield self.dumps({'error': _('تعذر إكمال القائمة')}) + b'\n'
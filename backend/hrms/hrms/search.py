@@ -0,0 +1,163 @@
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+
+# tashkeel, superscript alef and tatweel
+ARABIC_MARKS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+ARABIC_LETTERS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ئ': 'ي', 'ؤ': 'و', 'ة': 'ه',
+    **{chr(0x0660 + digit): str(digit) for digit in range(10)},
+    **{chr(0x06f0 + digit): str(digit) for digit in range(10)},
+})
+TOKEN = re.compile(r'\w+')
+
+SEARCH_INDEXES = []
+
+
+def normalize_text(text):
+    """Folds the spelling variants of Arabic letters, drops diacritics and lower-cases latin text"""
+    if not text:
+        return ''
+    return ARABIC_MARKS.sub('', str(text)).translate(ARABIC_LETTERS).casefold()
+
+
+class SearchIndex:
+    """
+    SQLite FTS5 table holding the normalized searchable fields of a model, the rowid is the primary key.
+
+    Rows are written by the app signals (or `index` on bulk paths) in the same transaction as the model,
+    `filter` restricts a queryset to the table's matches and orders it by bm25 rank. Other databases, or a
+    database where the table was not created, fall back to `icontains` lookups.
+
+    `substring_fields` (identifiers like phone numbers) also keep matching a digits-only query anywhere
+    in the value, not only at the start of a token.
+    """
+
+    def __init__(self, table, fields, weights=None, substring_fields=()):
+        self.table = table
+        self.fields = list(fields)
+        self.weights = list(weights or [1.0] * len(self.fields))
+        self.substring_fields = list(substring_fields)
+        self._available = {}
+        SEARCH_INDEXES.append(self)
+
+    # ---------------------------
+    # Schema
+    # ---------------------------
+    def create(self, using=DEFAULT_DB_ALIAS):
+        conn = connections[using]
+        if conn.vendor != 'sqlite':
+            return
+        columns = ', '.join(self.fields)
+        weights = ', '.join(str(weight) for weight in self.weights)
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} "
+                f"USING fts5({columns}, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+            cursor.execute(f"INSERT INTO {self.table}({self.table}, rank) VALUES ('rank', 'bm25({weights})')")
+        self._available.pop(using, None)
+
+    def drop(self, using=DEFAULT_DB_ALIAS):
+        conn = connections[using]
+        if conn.vendor != 'sqlite':
+            return
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+        self._available.pop(using, None)
+
+    def is_available(self, using=DEFAULT_DB_ALIAS):
+        if using not in self._available:
+            conn = connections[using]
+            self._available[using] = (
+                conn.vendor == 'sqlite' and self.table in conn.introspection.table_names()
+            )
+        return self._available[using]
+
+    # ---------------------------
+    # Rows
+    # ---------------------------
+    def index(self, objects, using=DEFAULT_DB_ALIAS):
+        """Inserts or replaces the rows of model instances (or historical model instances in migrations)"""
+        if not self.is_available(using):
+            return
+        rows = [(obj.pk, *(normalize_text(getattr(obj, field)) for field in self.fields)) for obj in objects]
+        if not rows:
+            return
+        placeholders = ', '.join(['%s'] * (len(self.fields) + 1))
+        with connections[using].cursor() as cursor:
+            self._delete(cursor, [row[0] for row in rows])
+            cursor.executemany(
+                f"INSERT INTO {self.table}(rowid, {', '.join(self.fields)}) VALUES ({placeholders})", rows
+            )
+
+    def remove(self, ids, using=DEFAULT_DB_ALIAS):
+        ids = list(ids)
+        if ids and self.is_available(using):
+            with connections[using].cursor() as cursor:
+                self._delete(cursor, ids)
+
+    def _delete(self, cursor, ids):
+        cursor.executemany(f"DELETE FROM {self.table} WHERE rowid = %s", [(pk,) for pk in ids])
+
+    def rebuild(self, queryset, batch_size=1000):
+        using = queryset.db
+        if not self.is_available(using):
+            return 0
+        with connections[using].cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+
+        total = 0
+        batch = []
+        for obj in queryset.only('pk', *self.fields).iterator(chunk_size=batch_size):
+            batch.append(obj)
+            if len(batch) == batch_size:
+                self.index(batch, using)
+                total += len(batch)
+                batch = []
+        self.index(batch, using)
+        total += len(batch)
+
+        with connections[using].cursor() as cursor:
+            cursor.execute(f"INSERT INTO {self.table}({self.table}) VALUES ('optimize')")
+        return total
+
+    # ---------------------------
+    # Search
+    # ---------------------------
+    def match_expression(self, text):
+        """Every token of the query has to prefix-match a token of the row"""
+        tokens = TOKEN.findall(normalize_text(text))
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+    def filter(self, queryset, text):
+        """Restricts the queryset to the rows matching `text`, best matches first"""
+        if not self.is_available(queryset.db):
+            conditions = [Q(**{f"{field}__icontains": text}) for field in self.fields]
+            return queryset.filter(reduce(or_, conditions))
+
+        expression = self.match_expression(text)
+        if not expression:
+            return queryset.none()
+
+        quote_name = connections[queryset.db].ops.quote_name
+        pk = f"{quote_name(queryset.model._meta.db_table)}.{quote_name(queryset.model._meta.pk.column)}"
+        condition = Q(pk__in=RawSQL(f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", [expression]))
+
+        digits = normalize_text(text).strip()
+        if digits.isdigit():
+            for field in self.substring_fields:
+                condition |= Q(**{f"{field}__icontains": digits})
+
+        # substring matches that are not full text matches have no rank and come last
+        rank = RawSQL(
+            f"SELECT rank FROM {self.table} WHERE {self.table} MATCH %s AND rowid = {pk}", [expression]
+        )
+        return queryset.filter(condition).annotate(search_rank=rank).order_by(
+            F('search_rank').asc(nulls_last=True), 'pk'
+        )
@@ -128,6 +128,28 @@ MEDIA_URL = 'media/'
 STATIC_ROOT = BASE_DIR / 'static'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Cache
+# the default cache stays per process, the other aliases are file based so every worker process sees
+# the same entries and invalidations
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # derived data shared by the workers (stats, permission rows), checked against a version on read
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'shared',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    # a fixed set of version keys (hrms.versions), the entry limit is out of reach so they are never culled
+    'versions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'versions',
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 1_000_000},
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -136,6 +158,18 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Custom Settings
 AUTH_USER_MODEL = 'users.User'
 
+# attendance older than this many whole months is moved to the archive by archive_attendance
+ATTENDANCE_ARCHIVE_AFTER_MONTHS = 12
+
+# last_login of API requests is kept in memory and written at most every LAST_SEEN_FLUSH_SECONDS,
+# a user's last_login only moves once every LAST_SEEN_GRANULARITY_SECONDS
+LAST_SEEN_FLUSH_SECONDS = 60
+LAST_SEEN_GRANULARITY_SECONDS = 60
+
+# authenticated users are kept per process by token for AUTH_USER_CACHE_SECONDS (see authentication.user_cache)
+AUTH_USER_CACHE_SIZE = 1024
+AUTH_USER_CACHE_SECONDS = 60
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'authentication.authentication.BaseAuthentication',
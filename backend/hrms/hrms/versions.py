@@ -0,0 +1,34 @@
+import uuid
+
+from django.core.cache import caches
+from django.db import transaction
+
+# cache alias of the version keys, shared by the worker processes and never culled (see settings.CACHES)
+VERSIONS_CACHE = 'versions'
+
+
+def new_version():
+    return uuid.uuid4().hex
+
+
+def get_version(key):
+    """
+    Current version token of `key`. Entries cached under a version are ignored once it moves,
+    a missing key starts over with a fresh token, never with one an old entry was stored under.
+    """
+    cache = caches[VERSIONS_CACHE]
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, new_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key, version=None):
+    # a new token instead of an increment, concurrent bumps can't collapse into one value
+    caches[VERSIONS_CACHE].set(key, version or new_version(), timeout=None)
+
+
+def bump_version_on_commit(key):
+    """Bumps once the current transaction commits, readers can't cache uncommitted data under the new version"""
+    transaction.on_commit(lambda: bump_version(key))
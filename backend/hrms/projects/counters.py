@@ -0,0 +1,44 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Project, Task
+
+STATUS_COUNTERS = {
+    "completed": "completed_tasks_count",
+    "incomplete": "incomplete_tasks_count",
+}
+
+
+def apply_task_counter_delta(project_id, status, delta):
+    """Add delta (+1/-1) to the counters of the project for a task of the given status"""
+    if project_id is None:
+        return
+
+    updates = {"tasks_count": F("tasks_count") + delta}
+    status_field = STATUS_COUNTERS.get(status)
+    if status_field:
+        updates[status_field] = F(status_field) + delta
+    Project.objects.filter(pk=project_id).update(**updates)
+
+
+def task_count_subquery(**filters):
+    tasks = (
+        Task.objects.filter(project=OuterRef("pk"), **filters)
+        .order_by()
+        .values("project")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    return Coalesce(Subquery(tasks), 0)
+
+
+def rebuild_task_counters(queryset=None):
+    """Recount the counters from the task table in a single UPDATE"""
+    if queryset is None:
+        queryset = Project.objects.all()
+
+    return queryset.update(
+        tasks_count=task_count_subquery(),
+        completed_tasks_count=task_count_subquery(status="completed"),
+        incomplete_tasks_count=task_count_subquery(status="incomplete"),
+    )
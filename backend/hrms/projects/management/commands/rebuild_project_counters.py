@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from projects.counters import rebuild_task_counters
+
+
+class Command(BaseCommand):
+    help = "Recount the denormalized task counters of every project"
+
+    def handle(self, *args, **options):
+        updated = rebuild_task_counters()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt task counters of {updated} projects"))
@@ -0,0 +1,52 @@
+# Generated by Django 5.2 on 2026-10-18 18:52
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_task_counters(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('projects', 'Task')
+
+    def task_count(**filters):
+        tasks = (
+            Task.objects.filter(project=OuterRef('pk'), **filters)
+            .order_by()
+            .values('project')
+            .annotate(count=Count('id'))
+            .values('count')
+        )
+        return Coalesce(Subquery(tasks), 0)
+
+    Project.objects.update(
+        tasks_count=task_count(),
+        completed_tasks_count=task_count(status='completed'),
+        incomplete_tasks_count=task_count(status='incomplete'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0017_task_completed_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='completed_tasks_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='المهام المكتملة'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='incomplete_tasks_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='المهام غير المكتملة'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tasks_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='إجمالي المهام'),
+        ),
+        migrations.RunPython(populate_task_counters, migrations.RunPython.noop),
+    ]
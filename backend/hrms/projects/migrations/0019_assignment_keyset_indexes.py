@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-18 18:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0018_project_task_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='projectassignment',
+            index=models.Index(fields=['project', 'assigned_at', 'id'], name='projects_pr_project_fd1d9f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectassignment',
+            index=models.Index(fields=['assigned_at', 'id'], name='projects_pr_assigne_ec2734_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskassignment',
+            index=models.Index(fields=['task', 'assigned_at', 'id'], name='projects_ta_task_id_44dac3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskassignment',
+            index=models.Index(fields=['assigned_at', 'id'], name='projects_ta_assigne_4f2339_idx'),
+        ),
+    ]
@@ -99,10 +99,29 @@ class Project(AbstractBaseModel):
         verbose_name=_("ملاحظات"),
     )
 
+    # denormalized task counters, maintained by projects.signals
+    tasks_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("إجمالي المهام"))
+    completed_tasks_count = models.PositiveIntegerField(default=0, editable=False,
+                                                        verbose_name=_("المهام المكتملة"))
+    incomplete_tasks_count = models.PositiveIntegerField(default=0, editable=False,
+                                                         verbose_name=_("المهام غير المكتملة"))
+
+    COUNTER_FIELDS = ("tasks_count", "completed_tasks_count", "incomplete_tasks_count")
+
     def clean(self):
         if self.end_date and self.start_date and self.end_date < self.start_date:
             raise ValidationError(_("تاريخ الانتهاء يجب أن يكون بعد تاريخ البدء."))
 
+    def save(self, *args, **kwargs):
+        # the counters only move through F() updates (projects.counters), a full save of an existing project
+        # leaves them alone instead of writing back the values it was loaded with
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = _("مشروع")
         verbose_name_plural = _("المشاريع")
@@ -112,6 +131,12 @@ class Project(AbstractBaseModel):
             project=self, status="incomplete"
         )
 
+    @property
+    def progress(self):
+        if not self.tasks_count:
+            return 0
+        return round((self.completed_tasks_count / self.tasks_count) * 100)
+
     def __str__(self):
         return self.name
 
@@ -147,6 +172,13 @@ class ProjectAssignment(models.Model):
 
     assigned_by_employee = models.BooleanField(default=True, verbose_name=_("تم التعيين من خلال موظف"))
 
+    class Meta:
+        indexes = [
+            # keyset pagination of the timelines
+            models.Index(fields=["project", "assigned_at", "id"]),
+            models.Index(fields=["assigned_at", "id"]),
+        ]
+
 
 class Task(AbstractBaseModel):
     title = models.CharField(
@@ -216,9 +248,12 @@ class Task(AbstractBaseModel):
     def delete(self, using=None, keep_parents=False):
         project = self.project
         super(Task, self).delete()
-        if not project.remaining_tasks().exists():
+        if project is None:
+            return
+        project.refresh_from_db(fields=["incomplete_tasks_count"])
+        if not project.incomplete_tasks_count:
             project.status = "completed"
-            project.save()
+            project.save(update_fields=["status"])
 
     def __str__(self):
         return self.title
@@ -254,3 +289,10 @@ class TaskAssignment(models.Model):
     )
 
     assigned_by_employee = models.BooleanField(default=True, verbose_name=_("تم التعيين من خلال موظف"))
+
+    class Meta:
+        indexes = [
+            # keyset pagination of the timelines
+            models.Index(fields=["task", "assigned_at", "id"]),
+            models.Index(fields=["assigned_at", "id"]),
+        ]
@@ -2,6 +2,7 @@ from django.conf import settings
 from rest_framework import serializers
 from .models import Project, Task, ProjectAssignment, TaskAssignment
 from employees.serializers import DepartmentSerializer
+from employees.thumbnails import get_thumbnail_url
 
 
 class ProjectReadSerializer(serializers.ModelSerializer):
@@ -11,6 +12,7 @@ class ProjectReadSerializer(serializers.ModelSerializer):
     created_at = serializers.SerializerMethodField()
     progress_started = serializers.SerializerMethodField()
     created_by = serializers.StringRelatedField(source="created_by.name")
+    progress = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Project
@@ -33,10 +35,12 @@ class ProjectListSerializer(serializers.ModelSerializer):
     url = serializers.HyperlinkedIdentityField(view_name='project-detail')
     supervisors = serializers.SerializerMethodField()
     status = serializers.StringRelatedField(source="get_status_display")
+    progress = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Project
-        fields = ['id', 'url', 'name', 'status', 'start_date', 'end_date', 'supervisors']
+        fields = ['id', 'url', 'name', 'status', 'start_date', 'end_date', 'supervisors', 'tasks_count',
+                  'completed_tasks_count', 'incomplete_tasks_count', 'progress']
 
     def get_supervisors(self, obj: Project):
         return [{"id": s.id, "name": s.name} for s in obj.supervisors.all()]
@@ -57,7 +61,7 @@ class ProjectWriteSerializer(serializers.ModelSerializer):
         project = super(ProjectWriteSerializer, self).create(validated_data)
         auth_user = self.context['request'].user
         project.created_by = auth_user
-        project.save()
+        project.save(update_fields=["created_by"])
         return project
 
 
@@ -114,10 +118,10 @@ class TaskWriteSerializer(serializers.ModelSerializer):
         task = super(TaskWriteSerializer, self).create(validated_data)
 
         # mark project as ongoing if it is completed
-        if hasattr(task, "project"):
+        if task.project:
             if task.project.status == "completed":
                 task.project.status = "ongoing"
-                task.project.save()
+                task.project.save(update_fields=["status"])
 
         auth_user = self.context['request'].user
         task.created_by = auth_user
@@ -150,10 +154,9 @@ class BaseAssignmentReadSerializer(serializers.ModelSerializer):
         return user.name
 
     def get_image(self, obj):
+        # rendered as a small avatar in the timelines
         if obj.assigned_by_employee and hasattr(obj.assigned_by, "employee"):
-            employee = obj.assigned_by.employee
-            if employee.image:
-                return self.context['request'].build_absolute_uri(employee.image.url)
+            return get_thumbnail_url(obj.assigned_by.employee.image, 'small', self.context['request'])
         return None
 
 
@@ -0,0 +1,39 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .counters import apply_task_counter_delta
+from .models import Project, Task
+from .stats import invalidate_stats
+
+
+@receiver(pre_save, sender=Task)
+def remember_task_counter_state(sender, instance, raw=False, **kwargs):
+    instance._counter_state = None
+    if instance.pk and not instance._state.adding:
+        instance._counter_state = Task.objects.filter(pk=instance.pk).values_list("project_id", "status").first()
+
+
+@receiver(post_save, sender=Task)
+def update_task_counters(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_counter_state", None)
+    current = (instance.project_id, instance.status)
+
+    if previous == current:
+        return
+
+    if previous is not None:
+        apply_task_counter_delta(*previous, -1)
+    apply_task_counter_delta(*current, 1)
+
+
+@receiver(post_delete, sender=Task)
+def decrement_task_counters(sender, instance, **kwargs):
+    apply_task_counter_delta(instance.project_id, instance.status, -1)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_cached_stats(sender, **kwargs):
+    invalidate_stats()
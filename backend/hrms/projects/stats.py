@@ -0,0 +1,101 @@
+from datetime import datetime
+from math import floor
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Q
+
+from hrms.versions import get_version, bump_version_on_commit
+from .models import Project, Task
+
+STATS_VERSION_KEY = "projects:stats:version"
+STATS_TIMEOUT = 60 * 60 * 24
+
+
+def cairo_today():
+    return datetime.now(settings.CAIRO_TZ).date()
+
+
+def get_stats_version():
+    return get_version(STATS_VERSION_KEY)
+
+
+def invalidate_stats():
+    """Move the version once the writer commits, so every cached stats entry is ignored from then on"""
+    bump_version_on_commit(STATS_VERSION_KEY)
+
+
+def get_cached_stats(name, calculate):
+    # the date is part of the key so the overdue counts roll over at Cairo midnight
+    today = cairo_today()
+    key = f"projects:stats:{name}:{get_stats_version()}:{today.isoformat()}"
+    return caches['shared'].get_or_set(key, lambda: calculate(today), timeout=STATS_TIMEOUT)
+
+
+def build_tasks_stats(total, completed, overdue):
+    incomplete = total - completed
+    rate = 0 if total == 0 else floor((completed / total) * 100)
+
+    return {
+        'total': total,
+        'completed': completed,
+        'incomplete': incomplete,
+        'overdue': overdue,
+        'rate': rate
+    }
+
+
+def calculate_projects_stats(today=None):
+    today = today or cairo_today()
+    rows = {
+        row["status"]: row
+        for row in Project.objects.order_by().values("status").annotate(
+            count=Count("id"),
+            overdue=Count("id", filter=Q(end_date__lt=today)),
+        )
+    }
+
+    def count(project_status):
+        return rows.get(project_status, {}).get("count", 0)
+
+    return {
+        'total': sum(row["count"] for row in rows.values()),
+        'ongoing': count("ongoing"),
+        'completed': count("completed"),
+        'pending_approval': count("pending-approval"),
+        'paused': count("paused"),
+        'overdue': sum(rows.get(s, {}).get("overdue", 0) for s in ("ongoing", "paused")),
+    }
+
+
+def calculate_tasks_stats(project_id=None, today=None):
+    today = today or cairo_today()
+    tasks = Task.objects.order_by()
+    if project_id is not None:
+        tasks = tasks.filter(project__id=project_id)
+
+    rows = {
+        row["status"]: row
+        for row in tasks.values("status").annotate(
+            count=Count("id"),
+            overdue=Count("id", filter=Q(due_date__lt=today)),
+        )
+    }
+    total = sum(row["count"] for row in rows.values())
+    completed = rows.get("completed", {}).get("count", 0)
+    overdue = rows.get("incomplete", {}).get("overdue", 0)
+    return build_tasks_stats(total, completed, overdue)
+
+
+def calculate_project_tasks_stats(project: Project):
+    """Same as calculate_tasks_stats but reads the totals from the project counters"""
+    overdue = project.tasks.filter(status="incomplete", due_date__lt=cairo_today()).count()
+    return build_tasks_stats(project.tasks_count, project.completed_tasks_count, overdue)
+
+
+def get_projects_stats():
+    return get_cached_stats("projects", calculate_projects_stats)
+
+
+def get_tasks_stats():
+    return get_cached_stats("tasks", lambda today: calculate_tasks_stats(today=today))
@@ -1,21 +1,23 @@
-from math import floor
 from datetime import datetime
 
 from django.conf import settings
+from hrms.rest_framework_utils.streaming import StreamingListMixin
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, action
 from .models import Project, Task, TaskAssignment, ProjectAssignment
+from .stats import get_projects_stats, get_tasks_stats, calculate_project_tasks_stats
+from employees.models import Department
 from .serializers import ProjectListSerializer, ProjectWriteSerializer, ProjectReadSerializer, TaskReadSerializer, \
     TaskWriteSerializer, TaskListSerializer, ProjectAssignmentWriteSerializer, ProjectAssignmentReadSerializer, \
     TaskAssignmentWriteSerializer, TaskAssignmentReadSerializer
-from django.db.models import Q
+from django.db.models import Q, Prefetch, Count
 from django.utils.translation import gettext_lazy as _
 from django.db import transaction
 from django.utils import timezone
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(StreamingListMixin, viewsets.ModelViewSet):
     queryset = Project.objects.all()
 
     def get_serializer_class(self):
@@ -26,7 +28,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         search = self.request.query_params.get('search', None)
         status_filters = self.request.query_params.get('status_filters', None)
-        queryset = Project.objects.all()
+        queryset = Project.objects.prefetch_related('supervisors')
 
         if search is not None:
             queryset = queryset.filter(name__icontains=search)
@@ -71,7 +73,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
                 project.progress_started = timezone.now()
 
             # Force completion if no remaining tasks
-            if not project.remaining_tasks().exists():
+            if not project.incomplete_tasks_count:
                 new_status = "completed"
 
             project.status = new_status
@@ -96,26 +98,26 @@ class ProjectViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["get"])
     def detailed(self, request, pk=None):
         try:
-            project = Project.objects.get(pk=pk)
+            project = Project.objects.select_related('created_by').prefetch_related('supervisors').get(pk=pk)
         except Project.DoesNotExist:
             return Response({"detail": _("مشروع غير موجود")}, status=status.HTTP_404_NOT_FOUND)
-        tasks = Task.objects.filter(project=project)
+        tasks = Task.objects.filter(project=project).select_related('project')
         serialized_tasks = TaskListSerializer(tasks, many=True, context={'request': request}).data
         serializer = ProjectReadSerializer(project, context={"request": request}).data
-        stats = calculate_tasks_stats(project.id)
+        stats = calculate_project_tasks_stats(project)
         return Response({**serializer, "tasks": serialized_tasks, "stats": stats}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['get'])
     def form_data(self, request, pk=None):
         try:
-            project = Project.objects.get(id=pk)
+            project = Project.objects.prefetch_related('supervisors').get(id=pk)
             serializer = ProjectWriteSerializer(project, context={"request": self.request}).data
             return Response(serializer)
         except Exception:
             return Response({'detail': _('مشروع غير موجود')}, status=status.HTTP_404_NOT_FOUND)
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(StreamingListMixin, viewsets.ModelViewSet):
     queryset = Task.objects.all()
 
     def get_serializer_class(self):
@@ -128,7 +130,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         status_filters = self.request.query_params.get('status_filters', None)
         priority_filters = self.request.query_params.get('priority_filters', None)
         project_id = self.request.query_params.get("project_id", None)
-        queryset = Task.objects.all()
+        queryset = Task.objects.select_related('project')
 
         if project_id is not None:
             queryset = queryset.filter(project__id=project_id)
@@ -157,8 +159,15 @@ class TaskViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["get"])
     def detailed(self, request, pk=None):
         try:
-            task = Task.objects.get(pk=pk)
-            project_tasks = Task.objects.filter(project=task.project)
+            task = (
+                Task.objects.select_related('project', 'created_by')
+                .prefetch_related(
+                    'assigned_to',
+                    Prefetch('departments', queryset=Department.objects.annotate(employee_count=Count('employee'))),
+                )
+                .get(pk=pk)
+            )
+            project_tasks = Task.objects.filter(project=task.project).select_related('project')
             project_tasks_serialized = TaskListSerializer(project_tasks, many=True, context={'request': request}).data
         except Task.DoesNotExist:
             return Response({"detail": _("مهمة غير موجودة")}, status=status.HTTP_404_NOT_FOUND)
@@ -168,39 +177,40 @@ class TaskViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def switch_state(self, request, pk=None):
         try:
-            task = Task.objects.get(pk=pk)
-            project = task.project
-            updated_project = False
-
-            if task.status == "completed":
-                task.status = "incomplete"
-                task.completed_at = None
-                # Downgrade project status only if it was marked as completed
-                if project and project.status == "completed":
-                    project.status = "ongoing"
-                    updated_project = True
-            else:
-                task.status = "completed"
-                task.completed_at = timezone.now()
-                # Check if this was the last incomplete task
-                if project:
-                    has_remaining_tasks = project.remaining_tasks().exclude(pk=task.pk).exists()
-                    if not has_remaining_tasks:
-                        project.status = "completed"
+            with transaction.atomic():
+                task = Task.objects.select_related("project").get(pk=pk)
+                project = task.project
+                updated_project = False
+
+                if task.status == "completed":
+                    task.status = "incomplete"
+                    task.completed_at = None
+                    # Downgrade project status only if it was marked as completed
+                    if project and project.status == "completed":
+                        project.status = "ongoing"
                         updated_project = True
-
-            task.save()
-            if updated_project:
-                project.save()
-
-            notes = request.data.get("notes")
-            TaskAssignment.objects.create(
-                task=task,
-                status=task.status,
-                notes=notes,
-                assigned_by=request.user if request.user.is_authenticated else None,
-                assigned_by_employee=hasattr(request.user, "employee"),
-            )
+                else:
+                    task.status = "completed"
+                    task.completed_at = timezone.now()
+                    # Check if this was the last incomplete task
+                    if project:
+                        has_remaining_tasks = project.incomplete_tasks_count > 1
+                        if not has_remaining_tasks:
+                            project.status = "completed"
+                            updated_project = True
+
+                task.save()
+                if updated_project:
+                    project.save(update_fields=["status"])
+
+                notes = request.data.get("notes")
+                TaskAssignment.objects.create(
+                    task=task,
+                    status=task.status,
+                    notes=notes,
+                    assigned_by=request.user if request.user.is_authenticated else None,
+                    assigned_by_employee=hasattr(request.user, "employee"),
+                )
 
             return Response({"status": task.get_status_display()}, status=status.HTTP_200_OK)
         except Task.DoesNotExist:
@@ -209,7 +219,7 @@ class TaskViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def form_data(self, request, pk=None):
         try:
-            task = Task.objects.get(id=pk)
+            task = Task.objects.select_related('project').prefetch_related('assigned_to').get(id=pk)
             serializer = TaskWriteSerializer(task, context={"request": self.request}).data
             return Response(serializer)
         except Task.DoesNotExist:
@@ -218,53 +228,18 @@ class TaskViewSet(viewsets.ModelViewSet):
 
 @api_view(["GET"])
 def projects_stats(request):
-    today = datetime.today().astimezone(settings.CAIRO_TZ).date()
-    total = Project.objects.count()
-    ongoing = Project.objects.filter(status="ongoing").count()
-    completed = Project.objects.filter(status="completed").count()
-    pending_approval = Project.objects.filter(status="pending-approval").count()
-    paused = Project.objects.filter(status="paused").count()
-    overdue = Project.objects.filter((Q(status="ongoing") | Q(status="paused")) & Q(end_date__lt=today)).count()
-    return Response(data={
-        'total': total,
-        'ongoing': ongoing,
-        'completed': completed,
-        'pending_approval': pending_approval,
-        'paused': paused,
-        'overdue': overdue
-    }, status=status.HTTP_200_OK)
-
-
-def calculate_tasks_stats(project_id=None):
-    today = datetime.today().astimezone(settings.CAIRO_TZ).date()
-    if project_id is not None:
-        tasks = Task.objects.filter(project__id=project_id)
-    else:
-        tasks = Task.objects.all()
-    total = tasks.count()
-    completed = tasks.filter(status="completed").count()
-    overdue = tasks.filter(Q(status="incomplete") & Q(due_date__lt=today)).count()
-    incomplete = total - completed
-    rate = 0 if total == 0 else floor((completed / total) * 100)
-
-    return {
-        'total': total,
-        'completed': completed,
-        'incomplete': incomplete,
-        'overdue': overdue,
-        'rate': rate
-    }
+    return Response(data=get_projects_stats(), status=status.HTTP_200_OK)
 
 
 @api_view(["GET"])
 def tasks_stats(request):
-    stats = calculate_tasks_stats()
-    return Response(stats, status=status.HTTP_200_OK)
+    return Response(get_tasks_stats(), status=status.HTTP_200_OK)
 
 
 # project assignment viewset
-class ProjectAssignmentViewSet(viewsets.ModelViewSet):
+class ProjectAssignmentViewSet(StreamingListMixin, viewsets.ModelViewSet):
     queryset = ProjectAssignment.objects.all()
+    cursor_ordering = ('-assigned_at', '-id')
 
     def get_serializer_class(self):
         if self.action in ["create", "update", "partial_update"]:
@@ -290,7 +265,7 @@ class ProjectAssignmentViewSet(viewsets.ModelViewSet):
         if status:
             queryset = queryset.filter(status=status)
 
-        return queryset.select_related('project', 'assigned_by')
+        return queryset.select_related('project', 'assigned_by__employee')
 
     def perform_create(self, serializer):
         """Set assigned_by to current user"""
@@ -298,8 +273,9 @@ class ProjectAssignmentViewSet(viewsets.ModelViewSet):
 
 
 # task assignment viewset
-class TaskAssignmentViewSet(viewsets.ModelViewSet):
+class TaskAssignmentViewSet(StreamingListMixin, viewsets.ModelViewSet):
     queryset = TaskAssignment.objects.all()
+    cursor_ordering = ('-assigned_at', '-id')
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -324,7 +300,7 @@ class TaskAssignmentViewSet(viewsets.ModelViewSet):
         if status:
             queryset = queryset.filter(status=status)
 
-        return queryset.select_related('task', 'assigned_by')
+        return queryset.select_related('task', 'assigned_by__employee')
 
     def perform_create(self, serializer):
         """Set assigned_by to current user"""
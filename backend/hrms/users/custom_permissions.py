@@ -0,0 +1,9 @@
+from rest_framework.permissions import BasePermission
+
+
+class IsRootUser(BasePermission):
+    """Root users and superusers, who manage the permissions of the others"""
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and (user.is_root or user.is_superuser))
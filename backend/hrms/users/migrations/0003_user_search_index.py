@@ -0,0 +1,61 @@
+import re
+
+from django.db import migrations
+
+TABLE = 'users_user_search'
+FIELDS = ['name', 'username', 'national_id', 'phone']
+WEIGHTS = '10.0, 5.0, 2.0, 2.0'
+
+# hrms.search.normalize_text as of this migration, kept here so later changes to it don't alter the migration
+ARABIC_MARKS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+ARABIC_LETTERS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ئ': 'ي', 'ؤ': 'و', 'ة': 'ه',
+    **{chr(0x0660 + digit): str(digit) for digit in range(10)},
+    **{chr(0x06f0 + digit): str(digit) for digit in range(10)},
+})
+
+
+def normalize_text(text):
+    if not text:
+        return ''
+    return ARABIC_MARKS.sub('', str(text)).translate(ARABIC_LETTERS).casefold()
+
+
+def create_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    User = apps.get_model('users', 'User')
+    rows = [
+        (pk, *(normalize_text(value) for value in values))
+        for pk, *values in User.objects.using(connection.alias).values_list('pk', *FIELDS).iterator()
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} "
+            f"USING fts5({', '.join(FIELDS)}, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+        cursor.execute(f"INSERT INTO {TABLE}({TABLE}, rank) VALUES ('rank', 'bm25({WEIGHTS})')")
+        cursor.executemany(
+            f"INSERT INTO {TABLE}(rowid, {', '.join(FIELDS)}) VALUES ({', '.join(['%s'] * (len(FIELDS) + 1))})",
+            rows,
+        )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_alter_user_last_login'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 19:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0003_user_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoleTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(error_messages={'unique': 'يوجد دور بهذا الاسم.'}, max_length=100, unique=True, verbose_name='الاسم')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('permissions', models.ManyToManyField(blank=True, related_name='role_templates', to='auth.permission', verbose_name='الصلاحيات')),
+            ],
+            options={
+                'verbose_name': 'دور',
+                'verbose_name_plural': 'الأدوار',
+                'ordering': ['name'],
+            },
+        ),
+    ]
@@ -1,8 +1,10 @@
 from django.db import models
-from django.contrib import auth
+from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin, _user_has_perm, Group, \
     Permission
 
+from .permissions import get_user_permissions
+
 
 class UserManager(BaseUserManager):
     def create_user(self, username, password=None, **extra_fields):
@@ -35,6 +37,9 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     last_login = models.DateTimeField(blank=True, null=True)
 
+    # moved with every change of the user's permissions or groups, in the same transaction (see users.permissions)
+    permissions_version = models.PositiveIntegerField(default=0, editable=False)
+
     objects = UserManager()
 
     USERNAME_FIELD = 'username'
@@ -54,11 +59,13 @@ class User(AbstractBaseUser, PermissionsMixin):
         if obj is not None:
             return _user_has_perm(self, perm, obj)
 
-        for backend in auth.get_backends():
-            if backend.has_perm(self, perm):
-                return True
+        # compiled once per permissions version, see users.permissions
+        return perm in get_user_permissions(self)
 
-        return False
+    def get_all_permissions(self, obj=None):
+        if obj is not None:
+            return super().get_all_permissions(obj)
+        return set(get_user_permissions(self)) if self.is_active else set()
 
     def has_module_perms(self, app_label):
         return True
@@ -66,3 +73,24 @@ class User(AbstractBaseUser, PermissionsMixin):
     @property
     def is_staff(self):
         return self.is_superuser or self.is_moderator
+
+
+class RoleTemplate(models.Model):
+    """Named permission set applied to many users at once (see users.roles)"""
+    name = models.CharField(
+        _("الاسم"),
+        max_length=100,
+        unique=True,
+        error_messages={'unique': _("يوجد دور بهذا الاسم.")},
+    )
+    permissions = models.ManyToManyField(Permission, blank=True, related_name='role_templates',
+                                         verbose_name=_("الصلاحيات"))
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        verbose_name = _("دور")
+        verbose_name_plural = _("الأدوار")
+        ordering = ['name']
@@ -0,0 +1,62 @@
+from django.contrib.auth.models import Permission
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F, Q
+from django.dispatch import Signal
+
+PERMISSIONS_CACHE = 'shared'
+PERMISSIONS_TIMEOUT = 60 * 60 * 24
+
+# sent once a transaction that moved the permissions version of some users commits, with their `user_ids`
+permissions_version_changed = Signal()
+
+
+def bump_permissions_version(users):
+    """
+    Moves the permissions version of `users` (a User queryset) in the current transaction, so the version
+    becomes visible together with the permissions it describes
+    """
+    user_ids = set(users.values_list('id', flat=True))
+    if not user_ids:
+        return
+    users.model.objects.filter(pk__in=user_ids).update(permissions_version=F('permissions_version') + 1)
+    transaction.on_commit(lambda: permissions_version_changed.send(sender=users.model, user_ids=user_ids))
+
+
+def load_permission_rows(user_id):
+    """(app label, model, codename) of the user's own and group permissions, one query"""
+    return sorted(set(
+        Permission.objects.filter(Q(custom_user_permissions=user_id) | Q(group__custom_users=user_id))
+        .values_list('content_type__app_label', 'content_type__model', 'codename')
+    ))
+
+
+def get_permission_rows(user):
+    """
+    (version, rows) of the user's permissions. The rows are cached with the version they were read at,
+    an entry of another version is read again.
+    """
+    cache = caches[PERMISSIONS_CACHE]
+    key = f"users:permissions:{user.pk}"
+    version = user.permissions_version
+
+    entry = cache.get(key)
+    if entry is not None and entry[0] == version:
+        return version, entry[1]
+
+    rows = load_permission_rows(user.pk)
+    cache.set(key, (version, rows), timeout=PERMISSIONS_TIMEOUT)
+    return version, rows
+
+
+def get_user_permissions(user):
+    """
+    Frozenset of the user's 'app_label.codename' permissions, kept on the user instance for the rest of
+    the request once read
+    """
+    permissions = getattr(user, '_compiled_permissions', None)
+    if permissions is None:
+        _, rows = get_permission_rows(user)
+        permissions = frozenset(f"{app_label}.{codename}" for app_label, _, codename in rows)
+        user._compiled_permissions = permissions
+    return permissions
@@ -0,0 +1,75 @@
+from collections import defaultdict
+
+from django.contrib.auth.models import Permission
+from django.db import transaction
+
+from .models import User
+from .permissions import bump_permissions_version
+
+ASSIGN_BATCH_SIZE = 1000
+
+
+def resolve_permissions(names):
+    """
+    ({'app_label.codename': permission id}, names matching no permission) of `names`, from one query.
+    A codename only matches within its own app.
+    """
+    pairs, unknown = {}, []
+    for name in names:
+        app_label, dot, codename = str(name).partition('.')
+        if dot and app_label and codename:
+            pairs[(app_label, codename)] = name
+        else:
+            unknown.append(name)
+
+    found = {}
+    if pairs:
+        rows = Permission.objects.filter(
+            content_type__app_label__in={app_label for app_label, _ in pairs},
+            codename__in={codename for _, codename in pairs},
+        ).values_list('content_type__app_label', 'codename', 'id')
+        for app_label, codename, permission_id in rows:
+            if (app_label, codename) in pairs:
+                found[f"{app_label}.{codename}"] = permission_id
+
+    unknown.extend(name for (app_label, codename), name in pairs.items() if f"{app_label}.{codename}" not in found)
+    return found, unknown
+
+
+def assign_permissions(user_ids, permission_ids, replace=True):
+    """
+    Gives the users `permission_ids`, with `replace` they end up with exactly those.
+    Only the difference is written: one delete and one bulk insert on the through table, in one transaction.
+    """
+    Through = User.user_permissions.through
+    user_ids, permission_ids = set(user_ids), set(permission_ids)
+
+    with transaction.atomic():
+        existing = defaultdict(dict)
+        for row_id, user_id, permission_id in Through.objects.filter(user_id__in=user_ids).values_list(
+                'id', 'user_id', 'permission_id'):
+            existing[user_id][permission_id] = row_id
+
+        added, removed, changed = [], [], set()
+        for user_id in user_ids:
+            current = existing[user_id]
+            new = permission_ids - current.keys()
+            old = current.keys() - permission_ids if replace else ()
+            added.extend(Through(user_id=user_id, permission_id=permission_id) for permission_id in new)
+            removed.extend(current[permission_id] for permission_id in old)
+            if new or old:
+                changed.add(user_id)
+
+        if removed:
+            Through.objects.filter(id__in=removed).delete()
+        Through.objects.bulk_create(added, batch_size=ASSIGN_BATCH_SIZE)
+
+        # the through table is written directly, m2m_changed does not fire
+        bump_permissions_version(User.objects.filter(pk__in=changed))
+
+    return {'users': len(user_ids), 'added': len(added), 'removed': len(removed)}
+
+
+def permission_names(permissions):
+    """'app_label.codename' of permissions fetched with their content type"""
+    return sorted(f"{permission.content_type.app_label}.{permission.codename}" for permission in permissions)
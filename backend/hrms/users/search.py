@@ -0,0 +1,8 @@
+from hrms.search import SearchIndex
+
+user_search = SearchIndex(
+    'users_user_search',
+    fields=['name', 'username', 'national_id', 'phone'],
+    weights=[10.0, 5.0, 2.0, 2.0],
+    substring_fields=['username', 'national_id', 'phone'],
+)
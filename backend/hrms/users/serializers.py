@@ -1,7 +1,9 @@
 from django.conf import settings
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 from rest_framework.relations import HyperlinkedIdentityField
-from .models import User
+from .models import User, RoleTemplate
+from .roles import resolve_permissions, permission_names
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -47,3 +49,64 @@ class UserSerializer(serializers.ModelSerializer):
         user.set_password(password)
         user.save()
         return user
+
+
+class RoleTemplateSerializer(serializers.ModelSerializer):
+    # 'app_label.codename' names
+    permissions = serializers.ListField(child=serializers.CharField(), write_only=True, required=False)
+
+    class Meta:
+        model = RoleTemplate
+        fields = ['id', 'name', 'permissions', 'created_at']
+        read_only_fields = ['created_at']
+
+    def validate_permissions(self, value):
+        found, unknown = resolve_permissions(value)
+        if unknown:
+            raise serializers.ValidationError(_("صلاحيات غير معروفة: %(names)s") % {'names': ', '.join(unknown)})
+        return list(found.values())
+
+    def create(self, validated_data):
+        permissions = validated_data.pop('permissions', [])
+        template = super().create(validated_data)
+        template.permissions.set(permissions)
+        return template
+
+    def update(self, instance, validated_data):
+        permissions = validated_data.pop('permissions', None)
+        template = super().update(instance, validated_data)
+        if permissions is not None:
+            template.permissions.set(permissions)
+        return template
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data['permissions'] = permission_names(instance.permissions.all())
+        return data
+
+
+class SetUserPermissionsSerializer(serializers.Serializer):
+    username = serializers.CharField(required=False)
+    usernames = serializers.ListField(child=serializers.CharField(), required=False, default=list)
+    permissions = serializers.ListField(child=serializers.CharField(), required=False, default=list)
+    # replace the users' permissions instead of adding to them
+    replace = serializers.BooleanField(default=True)
+
+    def validate(self, attrs):
+        if 'username' in attrs:
+            attrs['usernames'] = [*attrs['usernames'], attrs.pop('username')]
+        if not attrs['usernames']:
+            raise serializers.ValidationError(_("يرجى تحديد المستخدمين."))
+        return attrs
+
+
+class ApplyRoleTemplateSerializer(serializers.Serializer):
+    users = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    department = serializers.IntegerField(required=False, allow_null=True, default=None)
+    # replace the users' permissions instead of adding to them
+    replace = serializers.BooleanField(default=True)
+
+    def validate(self, attrs):
+        if not attrs['users'] and attrs['department'] is None:
+            raise serializers.ValidationError(_("يرجى تحديد المستخدمين أو القسم."))
+        return attrs
@@ -1,13 +1,17 @@
-from django.apps import apps
-from django.contrib.auth.models import Permission
+from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
 from django.dispatch import receiver
-from django.db.models.signals import post_migrate
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_migrate, post_save, post_delete, pre_delete
 
+from .models import User
+from .permissions import bump_permissions_version
+from .search import user_search
 
-@reciever(post_migrate)
+
+@receiver(post_migrate)
 def create_custom_permissions(sender, **kwargs):
-    for model in apps.get_models():
+    for model in sender.get_models():
         content_type = ContentType.objects.get_for_model(model)
 
         permissions = [
@@ -18,4 +22,53 @@ def create_custom_permissions(sender, **kwargs):
         ]
 
         for codename, name in permissions:
-            Permission.objects.get_or_create(codename=codename, name=name, content_type=content_type)
+            Permission.objects.get_or_create(codename=codename, content_type=content_type, defaults={'name': name})
+
+
+@receiver(post_save, sender=User)
+def index_user(sender, instance, update_fields, using, **kwargs):
+    # last_login updates on every sign in do not touch the index
+    if update_fields is None or set(update_fields) & set(user_search.fields):
+        user_search.index([instance], using)
+
+
+@receiver(post_delete, sender=User)
+def unindex_user(sender, instance, using, **kwargs):
+    user_search.remove([instance.pk], using)
+
+
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=User.groups.through)
+def user_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        bump_permissions_version(User.objects.filter(pk=instance.pk))
+    elif action == 'pre_clear':
+        # cleared from the permission or group side, its users are only known until the rows go
+        rows = sender.objects.filter(**{type(instance)._meta.model_name: instance})
+        bump_permissions_version(User.objects.filter(pk__in=rows.values('user_id')))
+    else:
+        bump_permissions_version(User.objects.filter(pk__in=pk_set))
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        bump_permissions_version(User.objects.filter(groups=instance))
+    elif action == 'pre_clear':
+        bump_permissions_version(User.objects.filter(groups__permissions=instance))
+    else:
+        bump_permissions_version(User.objects.filter(groups__in=pk_set))
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    bump_permissions_version(User.objects.filter(groups=instance))
+
+
+@receiver(pre_delete, sender=Permission)
+def permission_deleted(sender, instance, **kwargs):
+    bump_permissions_version(User.objects.filter(Q(user_permissions=instance) | Q(groups__permissions=instance)))
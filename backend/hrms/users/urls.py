@@ -1,11 +1,16 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import UserViewSet, change_password
+from .views import UserViewSet, RoleTemplateViewSet, change_password, get_user_permissions, get_models_permissions, \
+    set_user_permissions
 
 router = DefaultRouter()
 router.register('users', UserViewSet, basename='user')
+router.register('role-templates', RoleTemplateViewSet, basename='role-template')
 
 urlpatterns = [
     path('', include(router.urls)),
     path("change-password/", change_password, name="change-password"),
+    path("get-user-permissions/", get_user_permissions, name="get-user-permissions"),
+    path("get-models-permissions/", get_models_permissions, name="get-models-permissions"),
+    path("set-user-permissions/", set_user_permissions, name="set-user-permissions"),
 ]
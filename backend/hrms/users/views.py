@@ -1,19 +1,24 @@
 from rest_framework import status
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.viewsets import ModelViewSet
+from hrms.rest_framework_utils.streaming import StreamingListMixin
+from .serializers import UserSerializer, RoleTemplateSerializer, ApplyRoleTemplateSerializer, \
+    SetUserPermissionsSerializer
+from .models import User, RoleTemplate
+from .roles import resolve_permissions, assign_permissions
+from .search import user_search
+from .permissions import get_permission_rows
+from .custom_permissions import IsRootUser
+
+from django.utils.cache import parse_etags
 from django.db.models import Q
-from .serializers import UserSerializer
-from .models import User
+from django.utils.translation import gettext_lazy as _
 
-# for getting models permissions
-from django.apps import apps
-from django.contrib.contenttypes.models import ContentType
-from django.contrib.auth.models import Permission
 
-
-class UserViewSet(ModelViewSet):
+class UserViewSet(StreamingListMixin, ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
 
@@ -23,12 +28,7 @@ class UserViewSet(ModelViewSet):
         search_query = self.request.query_params.get('search', None)
 
         if search_query:
-            queryset = queryset.filter(
-                Q(name__icontains=search_query) |
-                Q(username__icontains=search_query) |
-                Q(national_id__icontains=search_query) |
-                Q(phone__icontains=search_query)
-            )
+            queryset = user_search.filter(queryset, search_query)
 
         is_superuser_param = self.request.query_params.get('is_superuser', None)
         if is_superuser_param:
@@ -38,61 +38,114 @@ class UserViewSet(ModelViewSet):
         return queryset
 
 
+def conditional_response(request, etag, build):
+    """304 when the client already has `etag`, else the data of `build()` tagged with it"""
+    if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+    if etag in if_none_match or '*' in if_none_match:
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+    return Response(data=build(), status=status.HTTP_200_OK, headers={'ETag': etag})
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_user_permissions(request):
-    user_permissions = {}
     username = request.GET.get('username', None)
-    if username is not None:
+    if username is not None and username != request.user.username:
+        # the permissions of other users are for the ones managing them
+        if not IsRootUser().has_permission(request, None):
+            raise PermissionDenied()
         try:
             user = User.objects.get(username=username)
         except:
             return Response(status=status.HTTP_404_NOT_FOUND)
     else:
         user = request.user
-    permissions = user.get_user_permissions()
-    return Response(data=permissions, status=status.HTTP_200_OK)
+    version, rows = get_permission_rows(user)
+    return conditional_response(
+        request,
+        f'"{user.pk}.{version}"',
+        lambda: sorted({f"{app_label}.{codename}" for app_label, model, codename in rows}),
+    )
 
 
-@api_view(['POST'])
+@api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def get_models_permissions(request):
-    user_permissions = {}
+    """
+    {"app_label.model": [codenames]} of the user's permissions, built from the cached permission rows.
+    GET returns every model with an ETag of the permissions version, POST only the requested "models".
+    """
     user = request.user
-    data = request.data
-    models = [apps.get_model(app_label, model_name) for app_label, model_name in
-              (model.split(".") for model in data["models"])]
-    for model in models:
-        content_type = ContentType.objects.get_for_model(model)
-        model_permissions = Permission.objects.filter(content_type=content_type)
-        permissions = user.user_permissions.filter(id__in=model_permissions)
-        user_permissions[f"{model._meta.app_label}.{model._meta.model_name}"] = [permission.codename for permission in
-                                                                                 permissions]
-
-    # model = apps.get_model('users', user.username)
+    version, rows = get_permission_rows(user)
+
+    def build_map():
+        permissions_map = {}
+        for app_label, model, codename in rows:
+            permissions_map.setdefault(f"{app_label}.{model}", []).append(codename)
+        return permissions_map
+
+    if request.method == 'GET':
+        return conditional_response(request, f'"{user.pk}.{version}"', build_map)
+
+    models = request.data.get("models", [])
+    if not isinstance(models, list):
+        return Response({'detail': _('بيانات غير صحيحة')}, status=status.HTTP_400_BAD_REQUEST)
+    permissions_map = build_map()
+    user_permissions = {str(model).lower(): permissions_map.get(str(model).lower(), []) for model in models}
     return Response(data=user_permissions, status=status.HTTP_200_OK)
 
 
 @api_view(["POST"])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsRootUser])
 def set_user_permissions(request):
-    try:
-        permission_list = request.data.get("permissions", [])
-        username = request.data.get("username", None)
-        print(permission_list)
-        print(username)
-        user = User.objects.get(username=username)
-        user.user_permissions.clear()
-        for permission in permission_list:
-            print(permission)
-            permission = permission.split(".")[-1]
-            perm = Permission.objects.filter(codename=permission).first()
-            if perm:
-                user.user_permissions.add(perm)
-        user.save()
-        return Response(status=status.HTTP_200_OK)
-    except:
-        return Response(status=status.HTTP_400_BAD_REQUEST)
+    """
+    Sets the 'app_label.codename' permissions of one user (username) or many (usernames), atomically.
+    With "replace": false the permissions are added to the current ones.
+    """
+    serializer = SetUserPermissionsSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    usernames = serializer.validated_data['usernames']
+
+    user_ids = dict(User.objects.filter(username__in=usernames).values_list('username', 'id'))
+    missing = [username for username in usernames if username not in user_ids]
+    if missing:
+        return Response({'usernames': missing, 'detail': _('المستخدم غير موجود')}, status=status.HTTP_400_BAD_REQUEST)
+
+    found, unknown = resolve_permissions(serializer.validated_data['permissions'])
+    if unknown:
+        return Response(
+            {'permissions': unknown, 'detail': _('صلاحيات غير معروفة')},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    report = assign_permissions(user_ids.values(), found.values(), replace=serializer.validated_data['replace'])
+    return Response(report, status=status.HTTP_200_OK)
+
+
+class RoleTemplateViewSet(ModelViewSet):
+    queryset = RoleTemplate.objects.prefetch_related('permissions__content_type')
+    serializer_class = RoleTemplateSerializer
+    permission_classes = [IsRootUser]
+
+    @action(detail=True, methods=['post'])
+    def apply(self, request, pk=None):
+        """Gives the template's permissions to the listed users and/or every user of a department's employees"""
+        template = self.get_object()
+        serializer = ApplyRoleTemplateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        users = Q(pk__in=data['users'])
+        if data['department'] is not None:
+            users |= Q(employee__department_id=data['department'])
+        user_ids = User.objects.filter(users).values_list('id', flat=True)
+
+        report = assign_permissions(
+            user_ids,
+            [permission.id for permission in template.permissions.all()],
+            replace=data['replace'],
+        )
+        return Response(report, status=status.HTTP_200_OK)
 
 
 @api_view(["PATCH"])